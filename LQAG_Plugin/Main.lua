@@ -5,6 +5,30 @@ import "Turbine.UI";  -- <--- DAS HAT GEFEHLT!
 local player = Turbine.Gameplay.LocalPlayer.GetInstance();
 local lastTargetName = "";
 
+-- Strukturierte Zeile für LQAG (eine pro Zielwechsel):
+-- LQAG|<version>|<unix-zeit s>|<spielzeit s>|<entity-id>|<name>
+-- Der Name steht zuletzt, damit er beliebige Zeichen enthalten darf.
+local RECORD_VERSION = 1;
+
+local function EntityId(target)
+    -- Eine stabile ID gibt es nicht auf jeder Client-Version -> leer lassen statt raten
+    if (target.GetID ~= nil) then
+        local ok, id = pcall(target.GetID, target);
+        if (ok and id ~= nil) then return tostring(id); end
+    end
+    return "";
+end
+
+local function Report(target, name)
+    local line = string.format("LQAG|%d|%d|%.3f|%s|%s",
+        RECORD_VERSION,
+        Turbine.Engine.GetLocalTime(),
+        Turbine.Engine.GetGameTime(),
+        EntityId(target),
+        name);
+    print(line);
+end
+
 -- Unsichtbares Fenster für Updates
 local scanner = Turbine.UI.Control();
 scanner:SetWantsUpdates(true);
@@ -19,7 +43,7 @@ scanner.Update = function(sender, args)
             lastTargetName = currentName;
             
             -- WICHTIG: print() schreibt in Script.log
-            print(currentName);
+            Report(target, currentName);
             
             -- Optional: Nachricht im Chat für dich
             -- Turbine.Shell.WriteLine("Ziel erkannt: " .. currentName);
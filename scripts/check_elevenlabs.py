@@ -0,0 +1,124 @@
+"""Prüft den ElevenLabs-Weg der AudioEngine gegen einen lokalen Stand-in-Server (kein echter Key, kein Netz).
+Aufruf: python scripts/check_elevenlabs.py  -> jede Prüfung mit OK/FEHLER, Exit-Code 1 bei einem Fehler."""
+import os
+import sys
+import time
+import queue
+import shutil
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+import numpy as np
+
+VOICE = "standin-voice-0001" # > 10 Zeichen, keine Datei -> wird direkt als ElevenLabs-ID benutzt
+SECONDS = 1.5 # Audio je Satz
+CHUNK_DELAY = 0.05 # Pause zwischen den gestreamten Stücken
+
+class StandIn(BaseHTTPRequestHandler):
+    """POST /text-to-speech/<voice>/stream: s16le-PCM in Stücken (chunked), wie die echte API.
+    Keys, die mit "dead" beginnen, bekommen 401 invalid_api_key, "limited..." bekommt 429 mit Retry-After."""
+    protocol_version = "HTTP/1.1"
+    requests = [] # (key, pfad, client-port)
+
+    def _error(self, status, body, headers=()):
+        self.send_response(status)
+        for k, v in headers: self.send_header(k, v)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        key = self.headers.get("xi-api-key", "")
+        StandIn.requests.append((key, self.path, self.client_address[1]))
+        if key.startswith("dead"): return self._error(401, b'{"detail": {"status": "invalid_api_key"}}')
+        if key.startswith("limited"): return self._error(429, b'{"detail": "too_many_concurrent_requests"}', [("Retry-After", "30")])
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/pcm")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pcm = (np.sin(np.arange(int(24000 * SECONDS)) / 10) * 8000).astype("<i2").tobytes()
+        try:
+            for i in range(0, len(pcm), 4800):
+                part = pcm[i:i + 4800]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+                self.wfile.flush()
+                time.sleep(CHUNK_DELAY)
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError: pass
+
+    def log_message(self, *args): pass
+
+def main():
+    from audio_engine import AudioEngine
+    from audio_cache import AudioCache
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache_dir = tempfile.mkdtemp(prefix="lqag-check-")
+    engine = AudioEngine()
+    engine.EL_API = f"http://127.0.0.1:{server.server_address[1]}"
+    engine.cache = AudioCache(cache_dir)
+    settings = {"use_elevenlabs": True, "elevenlabs_api_keys": ["good-key-0001"], "tts_lookahead": 3}
+    failed = []
+
+    def check(name, ok, info=""):
+        print(f"{'OK    ' if ok else 'FEHLER'} {name}{f' ({info})' if info else ''}")
+        if not ok: failed.append(name)
+
+    try:
+        # 1. Streaming: der erste Block kommt, bevor der Server fertig ist
+        sink, blocks = queue.Queue(), []
+        t0 = time.perf_counter()
+        threading.Thread(target=engine._fetch_el_sentence, args=("Ein Satz zum Streamen.", VOICE, settings, sink, engine.generation), daemon=True).start()
+        first_at = None
+        for block in iter(sink.get, None):
+            if first_at is None: first_at = time.perf_counter() - t0
+            blocks.append(block)
+        total = time.perf_counter() - t0
+        samples = sum(len(b[0]) for b in blocks)
+        check("Stream in mehreren Blöcken", len(blocks) > 1, f"{len(blocks)} Blöcke")
+        check("Erster Block vor Ende der Antwort", first_at is not None and first_at < total / 2, f"{first_at or 0:.2f}s von {total:.2f}s")
+        check("Alle Samples angekommen", samples == int(24000 * SECONDS), f"{samples}")
+
+        # 2. Cache: gleicher Satz noch einmal -> kein Request
+        before = len(StandIn.requests)
+        t0 = time.perf_counter()
+        res = engine.synthesize("Ein Satz zum Streamen.", VOICE, settings)
+        check("Cache-Treffer ohne Request", len(StandIn.requests) == before and res is not None, f"{time.perf_counter() - t0:.3f}s")
+
+        # 3. Key-Rotation: 401 invalid -> tot, 429 -> Cooldown, beim nächsten Satz direkt der gute Key
+        settings["elevenlabs_api_keys"] = ["dead-key-0001", "limited-key-0001", "good-key-0001"]
+        before = len(StandIn.requests)
+        engine.synthesize("Zweiter Satz für die Rotation.", VOICE, settings)
+        first = [r[0] for r in StandIn.requests[before:]]
+        check("Rotation 401 -> 429 -> gut", first == settings["elevenlabs_api_keys"], " -> ".join(k[:7] for k in first))
+        before = len(StandIn.requests)
+        engine.synthesize("Dritter Satz, Keys schon bekannt.", VOICE, settings)
+        second = [r[0] for r in StandIn.requests[before:]]
+        check("Toter Key und Cooldown übersprungen", second == ["good-key-0001"], " -> ".join(k[:7] for k in second))
+        stats = engine.elevenlabs_stats()
+        check("Key-Status", stats["dead-..."]["dead"] and stats["limit..."]["cooldown_s"] > 0, f"{stats['limit...']['cooldown_s']}s Cooldown")
+        engine.reset_elevenlabs_keys(settings["elevenlabs_api_keys"])
+        stats = engine.elevenlabs_stats()
+        check("Neu gespeicherte Keys wieder aktiv", not stats["dead-..."]["dead"] and stats["limit..."]["cooldown_s"] == 0)
+
+        # 4. Verbindungs-Pool: aufeinanderfolgende Sätze über dieselbe Verbindung
+        settings["elevenlabs_api_keys"] = ["good-key-0001"]
+        before = len(StandIn.requests)
+        for i in range(3): engine.synthesize(f"Satz Nummer {i} über den Pool.", VOICE, settings)
+        ports = {r[2] for r in StandIn.requests[before:]}
+        check("Keep-Alive: eine Verbindung für drei Sätze", len(ports) == 1, f"{len(ports)} Verbindung(en)")
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print("Alles OK." if not failed else f"{len(failed)} Prüfung(en) fehlgeschlagen.")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
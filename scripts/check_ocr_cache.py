@@ -0,0 +1,57 @@
+"""Prüft, dass der OCR-Cache kleine Textänderungen nicht mit dem alten Eintrag verwechselt, Capture-Rauschen aber toleriert.
+Rendert einen Dialog zweimal (eine Änderung), verarbeitet beide wie die Pipeline vor (Zeilen- und alter 3x-Weg)
+und fragt den Cache. Aufruf: python scripts/check_ocr_cache.py  -> OK/FEHLER je Prüfung, Exit-Code 1 bei einem Fehler.
+cv2.putText kann keine Umlaute, daher ö -> oe."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+import numpy as np
+import cv2
+from ocr_cache import OcrCache
+from ocr_preprocess import prepare_lines, legacy_preprocess
+
+DIALOG = ["Seid gegruesst, Reisender. Ihr habt lange gewartet.", "Toetet 3 Woelfe am Rand des Chet-Walds", "und kommt dann zurueck. Wartet nicht laenger."]
+EDITS = [("Ziffer", "Toetet 3 Woelfe", "Toetet 8 Woelfe"), ("Satzzeichen", "laenger.", "laenger!"), ("Wort", "gewartet", "gewarnt")]
+
+def render(lines, scale=0.5):
+    """Heller Text auf dunklem Grund mit Rahmen, ungefähr in Spielgröße (RGB wie ein Screenshot)"""
+    img = np.full((30 + 22 * len(lines), 460, 3), 25, dtype=np.uint8)
+    cv2.rectangle(img, (2, 2), (img.shape[1] - 3, img.shape[0] - 3), (150, 140, 110), 1)
+    for i, line in enumerate(lines):
+        cv2.putText(img, line, (12, 28 + 22 * i), cv2.FONT_HERSHEY_SIMPLEX, scale, (225, 215, 190), 1, cv2.LINE_AA)
+    return img
+
+def noisy(img, sigma=2.0, seed=1):
+    """Capture-Rauschen: leichtes Helligkeitsrauschen über das ganze Bild (Skalierung, Dithering, Kompression)"""
+    rng = np.random.default_rng(seed)
+    return np.clip(img.astype(np.float32) + rng.normal(0, sigma, img.shape), 0, 255).astype(np.uint8)
+
+def main():
+    paths = {"Zeilen": lambda img: prepare_lines(img).canvas, "alt 3x": legacy_preprocess}
+    failed = []
+
+    def check(name, ok):
+        print(f"{'OK    ' if ok else 'FEHLER'} {name}")
+        if not ok: failed.append(name)
+
+    base = render(DIALOG)
+    for path_name, prep in paths.items():
+        for edit_name, old, new in EDITS:
+            cache = OcrCache()
+            fp, _ = cache.get(prep(base))
+            cache.put(fp, "alt")
+            changed = render([line.replace(old, new) for line in DIALOG])
+            _, text = cache.get(prep(changed))
+            check(f"{path_name}: {edit_name} ({old!r} -> {new!r}) ist ein Miss", text is None)
+        cache = OcrCache()
+        fp, _ = cache.get(prep(base))
+        cache.put(fp, "alt")
+        check(f"{path_name}: gleicher Dialog ist ein Treffer", cache.get(prep(base))[1] == "alt")
+        check(f"{path_name}: gleicher Dialog mit Rauschen ist ein Treffer", cache.get(prep(noisy(base)))[1] == "alt")
+
+    print("Alles OK." if not failed else f"{len(failed)} Prüfung(en) fehlgeschlagen.")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
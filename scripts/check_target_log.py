@@ -0,0 +1,89 @@
+"""Prüft die Python-Seite des Ziel-Reporters (LQAG_Plugin/Main.lua) mit einem synthetischen Script.log:
+Reporter-Zeilen zwischen fremden Ausgaben, eine in zwei Schreibvorgängen geteilte Zeile, freie Zeilen danach,
+dazu das alte target.txt (nur ein Name, kein Newline). Kein Spiel nötig.
+Aufruf: python scripts/check_target_log.py  -> OK/FEHLER je Prüfung, Exit-Code 1 bei einem Fehler."""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from npc_manager import NpcManager, parse_target_line
+
+class SyntheticPlugin:
+    """Schreibt wie Main.lua: LQAG|1|<unix-zeit s>|<spielzeit s>|<entity-id>|<name>, Unix-Zeit nur in Sekunden"""
+
+    def __init__(self, path, game_start=5000.0):
+        self.path = path
+        self.t0 = time.time()
+        self.game_start = game_start
+        open(path, "w").close()
+
+    def line(self, entity_id, name):
+        now = time.time()
+        return f"LQAG|1|{int(now)}|{self.game_start + now - self.t0:.3f}|{entity_id}|{name}"
+
+    def write(self, text):
+        with open(self.path, "a", encoding="utf-8") as f: f.write(text)
+
+def main():
+    failed = []
+
+    def check(name, ok, info=""):
+        print(f"{'OK    ' if ok else 'FEHLER'} {name}{f' ({info})' if info else ''}")
+        if not ok: failed.append(name)
+
+    tmp = tempfile.mkdtemp(prefix="lqag-target-")
+    try:
+        log = os.path.join(tmp, "Script.log")
+        plugin = SyntheticPlugin(log)
+        npc = NpcManager()
+        npc.update(log) # erster Blick auf die (leere) Datei
+
+        # 1. Reporter-Zeilen zwischen fremden Ausgaben, auch mit Präfix
+        plugin.write("Andere Plugins laden...\n[Chat] Irgendwer: Hallo\n")
+        plugin.write(plugin.line("", "Bauer Maggot") + "\n")
+        plugin.write("Lua-Fehler in Foo.lua:12\n[LQAG] " + plugin.line("0x0208F1A3", "Elrond") + "\n")
+        npc.update(log)
+        check("Letzte Reporter-Zeile ist das Ziel", npc.current_target == "Elrond", npc.current_target)
+        check("Entity-ID übernommen", npc.current_record is not None and npc.current_record.entity_id == "0x0208F1A3")
+
+        # 2. Danach werden freie Zeilen ignoriert (kein Rückfall aufs alte Format)
+        plugin.write("Irgendein freier Text ohne Präfix\n")
+        npc.update(log)
+        check("Freie Zeile nach Reporter-Zeilen ignoriert", npc.current_target == "Elrond", npc.current_target)
+
+        # 3. Zeile in zwei Schreibvorgängen: erst nach dem Newline zählt sie
+        split = plugin.line("0x0208F1B7", "Galadriel")
+        plugin.write(split[:-4])
+        npc.update(log)
+        check("Halbe Zeile wird nicht gelesen", npc.current_target == "Elrond", npc.current_target)
+        plugin.write(split[-4:] + "\n")
+        npc.update(log)
+        check("Zusammengesetzte Zeile", npc.current_target == "Galadriel" and npc.current_record.entity_id == "0x0208F1B7", npc.current_target)
+        check("Unvollständige Zeilen werden verworfen", parse_target_line("LQAG|1|123|45.6|") is None and parse_target_line("LQAG|1|x|45.6|1|Name") is None)
+
+        # 4. Latenz: Meldung jetzt geschrieben -> kurz danach gelesen, trotz Unix-Zeit in ganzen Sekunden
+        for i in range(3):
+            time.sleep(0.4)
+            plugin.write(plugin.line(f"0x10{i}", f"Wache {i}") + "\n")
+        time.sleep(0.05)
+        npc.update(log)
+        latency = npc.target_latency()
+        check("target_latency plausibel (0..1 s)", latency is not None and -0.05 <= latency < 1.0, f"{latency:.3f}s" if latency is not None else "None")
+
+        # 5. Altes Plugin: target.txt mit nur einem Namen, ohne Newline
+        target = os.path.join(tmp, "target.txt")
+        with open(target, "w", encoding="utf-8") as f: f.write("Gandalf")
+        legacy = NpcManager()
+        legacy.update(target)
+        check("Altes Format: Name ohne Newline", legacy.current_target == "Gandalf" and legacy.target_latency() is None, legacy.current_target)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print("Alles OK." if not failed else f"{len(failed)} Prüfung(en) fehlgeschlagen.")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
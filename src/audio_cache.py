@@ -0,0 +1,124 @@
+import os
+import re
+import json
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+
+class AudioCache:
+    """Persistenter Satz-Cache: (Text, Stimme, Engine, Modell, Parameter) -> rohes PCM (float32).
+    Dateien liegen als <key>.<samplerate>.f32 im Cache-Ordner, LRU-Reihenfolge über mtime."""
+
+    FILE_RE = re.compile(r"^([0-9a-f]{40})\.(\d+)\.f32$")
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.index = OrderedDict() # key -> (path, samplerate, size), älteste zuerst
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        entries = []
+        try:
+            for name in os.listdir(self.cache_dir):
+                m = self.FILE_RE.match(name)
+                path = os.path.join(self.cache_dir, name)
+                if not m:
+                    # Reste von abgebrochenen Schreibvorgängen aufräumen
+                    if name.endswith(".tmp"):
+                        try: os.remove(path)
+                        except: pass
+                    continue
+                st = os.stat(path)
+                entries.append((st.st_mtime, m.group(1), path, int(m.group(2)), st.st_size))
+        except: pass
+        for _, key, path, fs, size in sorted(entries):
+            self.index[key] = (path, fs, size)
+            self.total_bytes += size
+
+    # --- SCHLÜSSEL ---
+    @staticmethod
+    def normalize_text(text):
+        t = unicodedata.normalize("NFC", text)
+        return " ".join(t.split())
+
+    @staticmethod
+    def voice_fingerprint(voice):
+        """Lokale Referenz-WAVs über Name+Größe+mtime, damit neu generierte Stimmen den Cache invalidieren."""
+        if voice and os.path.exists(voice):
+            st = os.stat(voice)
+            return f"{os.path.basename(voice)}:{st.st_size}:{st.st_mtime_ns}"
+        return voice or ""
+
+    def make_key(self, text, voice, engine, model, params=None):
+        payload = json.dumps([self.normalize_text(text), self.voice_fingerprint(voice), engine, model, params or {}], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    # --- ZUGRIFF ---
+    def get(self, key):
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.index.move_to_end(key)
+        path, fs, _ = entry
+        try:
+            data = np.fromfile(path, dtype=np.float32)
+            os.utime(path, None) # LRU-Position über Neustarts hinweg merken
+        except:
+            self._drop(key)
+            with self.lock: self.misses += 1
+            return None
+        with self.lock: self.hits += 1
+        return data, fs
+
+    def put(self, key, data, fs):
+        pcm = np.ascontiguousarray(data, dtype=np.float32)
+        if pcm.ndim > 1: pcm = np.ascontiguousarray(pcm.mean(axis=1), dtype=np.float32)
+        path = os.path.join(self.cache_dir, f"{key}.{int(fs)}.f32")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            pcm.tofile(tmp)
+            os.replace(tmp, path)
+        except:
+            try: os.remove(tmp)
+            except: pass
+            return
+        with self.lock:
+            old = self.index.pop(key, None)
+            if old: self.total_bytes -= old[2]
+            self.index[key] = (path, int(fs), pcm.nbytes)
+            self.total_bytes += pcm.nbytes
+            victims = []
+            while self.total_bytes > self.max_bytes and len(self.index) > 1:
+                _, (vpath, _, vsize) = self.index.popitem(last=False)
+                self.total_bytes -= vsize
+                victims.append(vpath)
+        for vpath in victims:
+            try: os.remove(vpath)
+            except: pass
+
+    def _drop(self, key):
+        with self.lock:
+            entry = self.index.pop(key, None)
+            if entry: self.total_bytes -= entry[2]
+        if entry:
+            try: os.remove(entry[0])
+            except: pass
+
+    def clear(self):
+        with self.lock:
+            paths = [e[0] for e in self.index.values()]
+            self.index.clear()
+            self.total_bytes = 0
+        for p in paths:
+            try: os.remove(p)
+            except: pass
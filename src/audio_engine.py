@@ -1,27 +1,65 @@
 import os
-import requests
-import torch
-import sounddevice as sd
 import soundfile as sf
 import threading
 import queue
-import re
+import io
+import collections
+from concurrent.futures import ThreadPoolExecutor
 import time
 import numpy as np
-from TTS.api import TTS
 import datetime
-import random
 import traceback
-import json
+from audio_cache import AudioCache
+from audio_output import AudioOutput, prepare_pcm
+from speaker_latents import SpeakerLatentCache
+from json_store import JsonStore
+from elevenlabs_client import ElevenLabsClient
+from text_segmenter import segment
+from tracing import tracer
+
+class RateLimiter:
+    """Höchstens <rate> Starts pro Sekunde, threadsicher (gleichmäßig verteilt statt fester Pausen)"""
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now: time.sleep(slot - now)
 
 class AudioEngine:
+    EL_API = "https://api.elevenlabs.io/v1"
+    EL_MODEL = "eleven_multilingual_v2"
+    EL_OUTPUT_FORMAT = "pcm_24000" # rohes s16le Mono, kein MP3-Decoding nötig
+    EL_SAMPLE_RATE = 24000
+    EL_FIRST_BLOCK = 0.2 # Sekunden Audio bevor der erste Block abgespielt wird
+    EL_STREAM_BLOCK = 1.0 # danach größere Blöcke
+    EL_MAX_WORKERS = 8 # Obergrenze für parallele Satz-Downloads (tts_lookahead)
+    XTTS_MODEL = "tts_models/multilingual/multi-dataset/xtts_v2"
+    XTTS_PARAMS = {"language": "de", "temperature": 0.75, "speed": 1.0, "repetition_penalty": 2.0}
+
     def __init__(self):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = None # wird mit dem Modell bestimmt (torch erst dann importieren)
         self.tts = None
+        self.tts_lock = threading.Lock()
         self.audio_queue = queue.Queue()
         self.is_playing = False
         self.is_paused = False
-        self.stop_signal = False
+        self.stop_signal = False # nur noch für den Bibliothek-Aufbau, Wiedergabe läuft über generation
+        self.generation = 0 # jedes speak()/stop() beginnt eine neue Generation, ältere Chunks werden verworfen
+        self.jobs = queue.Queue()
+        self.worker_lock = threading.Lock()
+        self.workers_started = False
+        self.el_pool = None
+        self.inflight = set() # offene ElevenLabs-Streams, stop() bricht sie ab
+        self.inflight_lock = threading.Lock()
+        self.on_progress = None
+        self.speak_started = 0.0
+        self.armed_gen = -1 # Generation, für die output.arm() den Zeitstempel nimmt
         self.volume = 1.0
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.root_dir = os.path.dirname(self.base_dir)
@@ -29,6 +67,11 @@ class AudioEngine:
         self.error_log = os.path.join(self.debug_dir, "audio_error.log")
         self.voice_map_path = os.path.join(self.root_dir, "resources", "voices", "generated", "voice_map.json")
         os.makedirs(self.debug_dir, exist_ok=True)
+        self.cache = AudioCache(os.path.join(self.root_dir, "resources", "cache", "audio"))
+        self.output = AudioOutput(samplerate=24000)
+        self.el_client = ElevenLabsClient(log=self.log_to_file)
+        self.voice_map_store = JsonStore(self.voice_map_path, default={}, indent=4, ensure_ascii=True)
+        self.latents = SpeakerLatentCache(os.path.join(os.path.dirname(self.voice_map_path), "latents"))
 
     def log_to_file(self, msg):
         try:
@@ -38,198 +81,422 @@ class AudioEngine:
         except: pass
 
     def load_voice_map(self):
-        if os.path.exists(self.voice_map_path):
-            try:
-                with open(self.voice_map_path, "r") as f: return json.load(f)
-            except: return {}
-        return {}
+        # Aus dem Speicher; von der Platte nur, wenn sich die Datei geändert hat
+        return self.voice_map_store.get()
 
     def save_voice_map(self, data):
-        try:
-            with open(self.voice_map_path, "w") as f: json.dump(data, f, indent=4)
-        except: pass
+        self.voice_map_store.replace(data)
+        self.voice_map_store.flush()
 
     # --- SMARTE REQUEST FUNKTION (KEY ROTATION) ---
-    def _make_elevenlabs_request(self, method, url, json_data, settings, timeout=20):
-        """Probiert alle Keys nacheinander durch, wenn einer failt (401/429)"""
+    def _make_elevenlabs_request(self, method, url, json_data, settings, timeout=20, stream=False):
+        """Probiert die Keys durch, wenn einer failt (401/402/429). Gepoolte Session, Keys mit leerem
+        Kontingent oder Rate-Limit werden bis zum Ende ihres Cooldowns übersprungen (siehe ElevenLabsClient).
+        Mit stream=True wird nur vor dem ersten Audio-Byte gewechselt."""
         keys = settings.get("elevenlabs_api_keys", [])
         if not keys: return None
-        
-        for key in keys:
-            headers = {"xi-api-key": key, "Content-Type": "application/json"}
-            try:
-                if method == "GET":
-                    res = requests.get(url, headers=headers, timeout=timeout)
-                else:
-                    res = requests.post(url, json=json_data, headers=headers, timeout=timeout)
-                
-                # Wenn erfolgreich: Fertig!
-                if res.status_code == 200:
-                    return res
-                
-                # Wenn Quota leer (401 Unauthorized oder 429 Too Many Requests)
-                if res.status_code in [401, 402, 429]:
-                    self.log_to_file(f"Key {key[:5]}... leer/fehlerhaft ({res.status_code}). Versuche nächsten...")
-                    continue # Nächster Key in der Schleife
-                
-                # Bei anderen Fehlern (500 etc) abbrechen
-                return res
-            except: 
-                continue # Bei Netzwerkfehler nächsten Key probieren
-        
-        return None # Alle Keys gescheitert
+        return self.el_client.request(method, url, json_data, keys, timeout=timeout, stream=stream)
+
+    def reset_elevenlabs_keys(self, keys):
+        """Nach dem Speichern in den Einstellungen: alle Keys bekommen eine neue Chance"""
+        self.el_client.reset_keys(keys)
+
+    def elevenlabs_stats(self):
+        """Pro Key: Requests, Fehler, letzte Antwort, mittlere Latenz, Rest-Cooldown"""
+        return self.el_client.stats()
 
     # --- GENERATOR ---
+    LIBRARY_TEXT = (
+        "Seid gegrüßt, Reisender! Ich habe schon viele Monde lang auf jemanden wie Euch gewartet. "
+        "Könnt Ihr das Flüstern des Windes in den alten Ruinen hören? Seid wachsam, denn die Schatten "
+        "in Mittelerde werden von Tag zu Tag länger. Aber verzagt nicht! Gemeinsam werden wir einen "
+        "Weg finden, um das Licht zurückzubringen. Sagt mir, seid Ihr bereit für dieses Abenteuer?"
+    )
+
     def generate_voice_library(self, settings, progress_callback=None):
         # Nutzt jetzt die Smart Request Funktion für GET
-        res = self._make_elevenlabs_request("GET", "https://api.elevenlabs.io/v1/voices", None, settings)
+        res = self._make_elevenlabs_request("GET", f"{self.EL_API}/voices", None, settings)
         all_voices = res.json().get("voices", []) if res and res.status_code == 200 else []
         
         if not all_voices: return False
 
+        # Feste Auswahl (nach voice_id sortiert) statt Zufall: ein zweiter Lauf setzt dort fort,
+        # wo der erste aufgehört hat, und jeder Rechner bekommt dieselbe Bibliothek
+        all_voices = sorted(all_voices, key=lambda v: v.get("voice_id", ""))
         males = [v for v in all_voices if v.get("labels", {}).get("gender") == "male"]
         females = [v for v in all_voices if v.get("labels", {}).get("gender") == "female"]
         targets = []
         if males or females:
-            for v in random.sample(males, min(len(males), 4)): targets.append((f"male_{v['name']}", v['voice_id']))
-            for v in random.sample(females, min(len(females), 4)): targets.append((f"female_{v['name']}", v['voice_id']))
+            for v in males[:4]: targets.append((f"male_{v['name']}", v['voice_id']))
+            for v in females[:4]: targets.append((f"female_{v['name']}", v['voice_id']))
         else:
             for v in all_voices[:6]: targets.append((f"neutral_{v['name']}", v['voice_id']))
 
-        ideal_text = (
-            "Seid gegrüßt, Reisender! Ich habe schon viele Monde lang auf jemanden wie Euch gewartet. "
-            "Könnt Ihr das Flüstern des Windes in den alten Ruinen hören? Seid wachsam, denn die Schatten "
-            "in Mittelerde werden von Tag zu Tag länger. Aber verzagt nicht! Gemeinsam werden wir einen "
-            "Weg finden, um das Licht zurückzubringen. Sagt mir, seid Ihr bereit für dieses Abenteuer?"
-        )
-        
-        save_path = os.path.join(self.root_dir, "resources", "voices", "generated")
+        save_path = os.path.dirname(self.voice_map_path)
         os.makedirs(save_path, exist_ok=True)
         voice_map = self.load_voice_map()
-        count = 0
-        
-        for i, (name, v_id) in enumerate(targets):
-            if self.stop_signal: break
-            safe_name = "".join(x for x in name if x.isalnum() or x in "_-")
-            filename = f"{safe_name}.wav"
-            if progress_callback: progress_callback(i + 1, len(targets), f"Lade (Lang): {safe_name}")
-            
-            # Nutzt jetzt die Smart Request Funktion für POST
-            data = {"text": ideal_text, "model_id": "eleven_multilingual_v2", "voice_settings": {"stability": 0.5, "similarity_boost": 0.75}}
-            res = self._make_elevenlabs_request("POST", f"https://api.elevenlabs.io/v1/text-to-speech/{v_id}", data, settings, timeout=120)
-            
+
+        # Schon vorhandene Stimmen überspringen (Datei liegt da, Eintrag wird notfalls nachgetragen)
+        todo = []
+        for name, v_id in targets:
+            filename = "".join(x for x in name if x.isalnum() or x in "_-") + ".wav"
+            if os.path.exists(os.path.join(save_path, filename)):
+                if voice_map.get(filename) != v_id: self.voice_map_store.set(filename, v_id)
+            else:
+                todo.append((filename, v_id))
+        self.voice_map_store.flush()
+
+        total = len(targets)
+        done = [total - len(todo)]
+        count = [0]
+        lock = threading.Lock()
+        limiter = RateLimiter(float(settings.get("library_rate_per_sec", 2.0)))
+        t_start = time.perf_counter()
+        if progress_callback: progress_callback(done[0], total, f"{done[0]}/{total} vorhanden, lade {len(todo)}...")
+
+        def fetch(filename, v_id):
+            if self.stop_signal: return
+            limiter.wait()
+            if self.stop_signal: return
+            data = {"text": self.LIBRARY_TEXT, "model_id": self.EL_MODEL, "voice_settings": {"stability": 0.5, "similarity_boost": 0.75}}
+            url = f"{self.EL_API}/text-to-speech/{v_id}?output_format={self.EL_OUTPUT_FORMAT}"
+            res = self._make_elevenlabs_request("POST", url, data, settings, timeout=120)
+            ok = False
             if res and res.status_code == 200:
-                with open(os.path.join(save_path, filename), "wb") as f: f.write(res.content)
-                voice_map[filename] = v_id
-                count += 1
-            time.sleep(1.0)
-            
-        self.save_voice_map(voice_map)
-        return count > 0
+                try:
+                    # Echte WAV schreiben (atomar), erst danach zählt die Stimme als vorhanden
+                    audio, fs = self._decode_el_audio(res)
+                    target = os.path.join(save_path, filename)
+                    sf.write(target + ".tmp", audio, fs, format="WAV")
+                    os.replace(target + ".tmp", target)
+                    self.voice_map_store.set(filename, v_id)
+                    self.voice_map_store.flush() # Eintrag für Eintrag -> Abbruch verliert nichts
+                    ok = True
+                except Exception as e: self.log_to_file(f"Stimme {filename} nicht gespeichert: {e}")
+            with lock:
+                done[0] += 1
+                if ok: count[0] += 1
+                rate = count[0] / max(1e-6, time.perf_counter() - t_start) * 60
+                if progress_callback: progress_callback(done[0], total, f"{filename}: {'OK' if ok else 'Fehler'} ({rate:.1f} Stimmen/min)")
+
+        workers = max(1, int(settings.get("library_workers", 4)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for filename, v_id in todo: pool.submit(fetch, filename, v_id)
+
+        return (total - len(todo)) + count[0] > 0
 
     # --- HYBRID ENGINE ---
     def load_local_tts(self):
-        if self.tts is None:
+        if self.tts is not None: return
+        with self.tts_lock:
+            if self.tts is not None: return
             self.log_to_file("Lade lokales XTTS Modell...")
-            self.tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(self.device)
+            import torch
+            from TTS.api import TTS
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            self.tts = TTS(self.XTTS_MODEL).to(self.device)
+
+    def warmup(self):
+        """Modell laden + Dummy-Inferenz, damit der erste echte Satz nicht die Initialisierung bezahlt"""
+        self.load_local_tts()
+        gen_dir = os.path.dirname(self.voice_map_path)
+        voices = sorted(f for f in os.listdir(gen_dir) if f.endswith(".wav")) if os.path.isdir(gen_dir) else []
+        if voices:
+            try: self._xtts_infer("Hallo.", os.path.join(gen_dir, voices[0]))
+            except Exception as e: self.log_to_file(f"Warm-up Inferenz fehlgeschlagen: {e}")
 
     def set_volume(self, val):
         self.volume = max(0.0, min(1.0, float(val) / 100.0))
+        self.output.volume = self.volume
 
     def toggle_pause(self):
         if not self.is_playing: return False
         self.is_paused = not self.is_paused
-        if self.is_paused: sd.stop()
+        self.output.paused = self.is_paused # Callback hält einfach an, Position bleibt
         return self.is_paused
 
     def speak(self, text, speaker_ref, settings, on_progress=None):
+        """Startet eine neue Generation: alles Ältere wird verworfen bzw. abgebrochen, die Worker laufen weiter"""
         self.stop()
         self.stop_signal = False
+        gen = self.generation
         self.is_playing = True
-        
-        debug_mode = settings.get("debug_mode", False)
-        # Check ob Cloud aktiviert ist UND Keys vorhanden sind
-        use_el = settings.get("use_elevenlabs") and settings.get("elevenlabs_api_keys")
-        
-        voice_id = None
+        self.on_progress = on_progress
+        self.cache.max_bytes = int(settings.get("audio_cache_mb", 512)) * 1024 * 1024
+        self.audio_queue.maxsize = max(1, int(settings.get("tts_lookahead", 3))) # hält den Speicher flach
+        self.speak_started = time.perf_counter()
+        self.armed_gen = gen
+        self.output.arm() # Callback merkt sich das erste hörbare Sample
+        self._ensure_workers()
+        self.jobs.put((gen, text, speaker_ref, settings))
+
+    def _ensure_workers(self):
+        """Ein Producer und ein Consumer für die ganze Laufzeit statt zwei neuer Threads pro speak()"""
+        with self.worker_lock:
+            if self.workers_started: return
+            threading.Thread(target=self._producer_loop, daemon=True, name="LQAG-TTS").start()
+            threading.Thread(target=self._consumer_loop, daemon=True, name="LQAG-Audio").start()
+            self.workers_started = True
+
+    def _stale(self, gen):
+        return gen != self.generation
+
+    def _resolve_voice_id(self, speaker_ref):
+        """ElevenLabs-ID zur lokalen Stimme (voice_map.json) oder direkt übergebene ID"""
         voice_map = self.load_voice_map()
         if speaker_ref and os.path.basename(speaker_ref) in voice_map:
-            voice_id = voice_map[os.path.basename(speaker_ref)]
-        elif speaker_ref and not os.path.exists(speaker_ref) and len(speaker_ref) > 10:
-            voice_id = speaker_ref
+            return voice_map[os.path.basename(speaker_ref)]
+        if speaker_ref and not os.path.exists(speaker_ref) and len(speaker_ref) > 10:
+            return speaker_ref
+        return None
 
-        if use_el and voice_id:
-            threading.Thread(target=self._producer_hybrid, args=(text, voice_id, speaker_ref, settings, on_progress, debug_mode), daemon=True).start()
-        else:
-            self.load_local_tts()
-            threading.Thread(target=self._producer_local, args=(text, speaker_ref, settings, on_progress, debug_mode), daemon=True).start()
-            
-        threading.Thread(target=self._consumer, args=(on_progress,), daemon=True).start()
+    def synthesize(self, text, speaker_ref, settings, chunks=None):
+        """Ohne Wiedergabe: ganzer Text als (pcm, fs), z.B. für den Batch-Modus der Pipeline. None, wenn nichts entstand.
+        chunks: fertige Häppchen statt self._split(text) (Benchmark des Segmenters)."""
+        gen = self.generation # ein stop() bricht auch das hier ab
+        voice_id = self._resolve_voice_id(speaker_ref)
+        use_el = settings.get("use_elevenlabs") and settings.get("elevenlabs_api_keys") and voice_id
+        parts, fs = [], None
+        for s in (chunks if chunks is not None else self._split(text)):
+            if self._stale(gen): return None
+            blocks = []
+            if use_el:
+                sink = queue.Queue()
+                self._fetch_el_sentence(s, voice_id, settings, sink, gen)
+                blocks = [b for b in iter(sink.get, None)]
+            if not blocks and speaker_ref and os.path.exists(speaker_ref):
+                hit = self._synth_local(s, speaker_ref)
+                if hit: blocks = [hit]
+            for data, block_fs in blocks:
+                fs = fs or block_fs
+                parts.append(prepare_pcm(data, block_fs, fs))
+        if not parts: return None
+        return np.concatenate(parts), fs
+
+    def _enqueue(self, item, gen):
+        """Blockierendes put auf die begrenzte Queue, gibt auf, sobald die Generation veraltet ist"""
+        while not self._stale(gen):
+            try:
+                self.audio_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full: continue
+        return False
+
+    def _producer_loop(self):
+        while True:
+            gen, text, speaker_ref, settings = self.jobs.get()
+            if self._stale(gen): continue # schon wieder überholt
+            try:
+                use_el = settings.get("use_elevenlabs") and settings.get("elevenlabs_api_keys")
+                voice_id = self._resolve_voice_id(speaker_ref)
+                if use_el and voice_id: self._producer_hybrid(gen, text, voice_id, speaker_ref, settings)
+                else: self._producer_local(gen, text, speaker_ref)
+            except Exception as e:
+                self.log_to_file(f"Producer Fehler: {e}")
+            self._enqueue((gen, None), gen)
 
-    def _producer_hybrid(self, text, voice_id, local_path, settings, on_progress, debug_mode):
+    def _producer_hybrid(self, gen, text, voice_id, local_path, settings):
         sentences = self._split(text)
-        for i, s in enumerate(sentences):
-            if self.stop_signal: break
+        total = len(sentences)
+        depth = max(1, min(self.EL_MAX_WORKERS, int(settings.get("tts_lookahead", 3))))
+        if self.el_pool is None: self.el_pool = ThreadPoolExecutor(max_workers=self.EL_MAX_WORKERS, thread_name_prefix="LQAG-EL")
+        # Pipeline: bis zu <depth> Sätze laufen parallel, abgespielt wird strikt in Reihenfolge
+        pending = collections.deque()
+        nxt = 0
+        while (pending or nxt < total) and not self._stale(gen):
+            while nxt < total and len(pending) < depth:
+                sink = queue.Queue()
+                self.el_pool.submit(self._fetch_el_sentence, sentences[nxt], voice_id, settings, sink, gen)
+                pending.append((nxt, sentences[nxt], sink))
+                nxt += 1
+
+            i, s, sink = pending.popleft()
             success = False
-            
-            # 1. Cloud Versuch (mit Key Rotation)
-            data = {"text": s, "model_id": "eleven_multilingual_v2"}
-            url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream"
-            
-            # Streaming ist schwer mit Rotation, wir nutzen hier normalen Request für Sicherheit
-            # (oder man baut Rotation für Stream, aber das ist komplexer. Hier "einfach" full download pro Satz)
-            res = self._make_elevenlabs_request("POST", url, data, settings, timeout=20)
-            
-            if res and res.status_code == 200:
-                with open("temp_el.mp3", "wb") as f: f.write(res.content)
-                data_audio, fs = sf.read("temp_el.mp3")
-                self.audio_queue.put((data_audio, fs, i+1, len(sentences), s))
+            while not self._stale(gen):
+                try: block = sink.get(timeout=0.1)
+                except queue.Empty: continue
+                if block is None: break
                 success = True
-            
-            # 2. Local Fallback
-            if not success:
+                if not self._enqueue((gen, block[0], block[1], i + 1, total, s), gen): break
+
+            # Local Fallback
+            if not success and not self._stale(gen):
                 if local_path and os.path.exists(local_path):
-                    self.load_local_tts()
-                    self._generate_local_chunk(s, local_path, i, len(sentences), debug_mode)
-        
-        self.audio_queue.put(None)
+                    self._generate_local_chunk(gen, s, local_path, i, total)
+
+    def _fetch_el_sentence(self, s, voice_id, settings, sink, gen):
+        """Worker: Cache oder ElevenLabs-Stream -> (pcm, fs) Blöcke in den Satz-Puffer, None am Ende"""
+        t0 = time.perf_counter()
+        cached = False
+        try:
+            if self._stale(gen): return
+            # 0. Cache (spart API-Quota)
+            key = self.cache.make_key(s, voice_id, "elevenlabs", self.EL_MODEL, {"output_format": self.EL_OUTPUT_FORMAT})
+            hit = self.cache.get(key)
+            if hit:
+                cached = True
+                sink.put(hit)
+                return
+
+            # 1. Cloud Versuch (Stream mit Key Rotation)
+            data = {"text": s, "model_id": self.EL_MODEL}
+            url = f"{self.EL_API}/text-to-speech/{voice_id}/stream?output_format={self.EL_OUTPUT_FORMAT}"
+            res = self._make_elevenlabs_request("POST", url, data, settings, timeout=20, stream=True)
+            if res is not None and self._stale(gen):
+                res.close() # während des Verbindungsaufbaus überholt
+            elif res and res.status_code == 200:
+                self._stream_el_sentence(res, key, sink, gen, t0)
+            elif res is not None:
+                res.close()
+        except Exception as e:
+            self.log_to_file(f"ElevenLabs Worker Fehler: {e}")
+        finally:
+            tracer.record("tts_elevenlabs", t0, time.perf_counter() - t0, {"chars": len(s), "cached": cached})
+            sink.put(None)
 
-    def _producer_local(self, text, speaker_wav, settings, on_progress, debug_mode):
+    def _producer_local(self, gen, text, speaker_wav):
+        # XTTS ist nicht threadsicher -> ein Worker, der dank begrenzter Queue <depth> Sätze vorarbeitet.
+        # Eine laufende Inferenz lässt sich nicht abbrechen, aber danach ist Schluss (das Ergebnis landet im Cache).
         sentences = self._split(text)
         for i, s in enumerate(sentences):
-            if self.stop_signal: break
-            self._generate_local_chunk(s, speaker_wav, i, len(sentences), debug_mode)
-        self.audio_queue.put(None)
+            if self._stale(gen): break
+            self._generate_local_chunk(gen, s, speaker_wav, i, len(sentences))
 
-    def _generate_local_chunk(self, text, speaker_wav, index, total, debug_mode):
+    def _generate_local_chunk(self, gen, text, speaker_wav, index, total):
         if not text.strip(): return
+        hit = self._synth_local(text, speaker_wav)
+        if hit and not self._stale(gen): self._enqueue((gen, hit[0], hit[1], index + 1, total, text), gen)
+
+    def _synth_local(self, text, speaker_wav):
+        """XTTS mit Cache davor -> (pcm, fs) oder None"""
+        key = self.cache.make_key(text, speaker_wav, "xtts", self.XTTS_MODEL, self.XTTS_PARAMS)
+        hit = self.cache.get(key)
+        if hit: return hit
         try:
-            out = "temp_gen.wav"
-            self.tts.tts_to_file(text=text, file_path=out, speaker_wav=speaker_wav, language="de", temperature=0.75, speed=1.0, repetition_penalty=2.0)
-            data, fs = sf.read(out)
-            self.audio_queue.put((data, 24000, index + 1, total, text))
-            if debug_mode:
-                 pass 
-        except: pass
+            self.load_local_tts() # Modell nur bei Cache-Miss laden
+            with tracer.span("tts_xtts", chars=len(text)): data = self._xtts_infer(text, speaker_wav)
+            fs = self.tts.synthesizer.output_sample_rate
+            self.cache.put(key, data, fs)
+            return data, fs
+        except Exception as e:
+            self.log_to_file(f"XTTS Fehler: {e}")
+            return None
+
+    def _xtts_infer(self, text, speaker_wav):
+        """Inferenz direkt aus den gecachten Speaker-Latents, statt sie bei jedem Satz neu aus der WAV zu rechnen"""
+        with self.tts_lock: # Warm-up und Producer dürfen das Modell nicht gleichzeitig benutzen
+            model = getattr(self.tts.synthesizer, "tts_model", None)
+            if model is None or not hasattr(model, "get_conditioning_latents"):
+                return np.asarray(self.tts.tts(text=text, speaker_wav=speaker_wav, **self.XTTS_PARAMS), dtype=np.float32)
+            gpt_cond_latent, speaker_embedding = self.latents.get(model, speaker_wav)
+            p = self.XTTS_PARAMS
+            out = model.inference(text, p["language"], gpt_cond_latent, speaker_embedding, temperature=p["temperature"], speed=p["speed"], repetition_penalty=p["repetition_penalty"])
+        wav = out["wav"]
+        if hasattr(wav, "cpu"): wav = wav.cpu().numpy()
+        return np.asarray(wav, dtype=np.float32).reshape(-1)
+
+    def _stream_el_sentence(self, res, key, sink, gen, t0=None):
+        """Dekodiert die Stream-Antwort blockweise in den Satz-Puffer. Nur komplette Sätze landen im Cache.
+        Solange sie läuft, steht die Antwort in inflight, damit stop() die Verbindung sofort kappen kann."""
+        ctype = res.headers.get("Content-Type", "")
+        parts = []
+        with self.inflight_lock:
+            if self._stale(gen):
+                res.close()
+                return
+            self.inflight.add(res)
+        try:
+            if any(t in ctype for t in ("mpeg", "mp3", "wav", "ogg")):
+                # Komprimierte Formate lassen sich nicht sauber stückweise dekodieren -> am Stück
+                data_audio, fs = self._decode_el_audio(res)
+                self.cache.put(key, data_audio, fs)
+                sink.put((data_audio, fs))
+                return
+
+            pending = b""
+            block = int(self.EL_FIRST_BLOCK * self.EL_SAMPLE_RATE) * 2
+            for raw in res.iter_content(chunk_size=4096):
+                if self._stale(gen): return
+                pending += raw
+                if len(pending) >= block:
+                    cut = len(pending) - len(pending) % 2 # s16le: nur ganze Samples
+                    pcm = np.frombuffer(pending[:cut], dtype="<i2").astype(np.float32) / 32768.0
+                    pending = pending[cut:]
+                    parts.append(pcm)
+                    sink.put((pcm, self.EL_SAMPLE_RATE))
+                    if t0 is not None and len(parts) == 1: tracer.record("tts_first_block", t0, time.perf_counter() - t0)
+                    block = int(self.EL_STREAM_BLOCK * self.EL_SAMPLE_RATE) * 2
+            if len(pending) >= 2:
+                pcm = np.frombuffer(pending[:len(pending) - len(pending) % 2], dtype="<i2").astype(np.float32) / 32768.0
+                parts.append(pcm)
+                sink.put((pcm, self.EL_SAMPLE_RATE))
+            if parts: self.cache.put(key, np.concatenate(parts), self.EL_SAMPLE_RATE)
+        except Exception as e:
+            # Abbruch mitten im Stream: Bereits gespieltes bleibt, nichts wird gecacht
+            if not self._stale(gen): self.log_to_file(f"Stream abgebrochen: {e}")
+        finally:
+            with self.inflight_lock: self.inflight.discard(res)
+            res.close()
+
+    def _decode_el_audio(self, res):
+        """Antwort direkt aus dem Speicher dekodieren: PCM per frombuffer, MP3 & Co. über soundfile"""
+        ctype = res.headers.get("Content-Type", "")
+        if any(t in ctype for t in ("mpeg", "mp3", "wav", "ogg")):
+            return sf.read(io.BytesIO(res.content), dtype="float32")
+        raw = res.content
+        pcm = np.frombuffer(raw[:len(raw) - len(raw) % 2], dtype="<i2")
+        return pcm.astype(np.float32) / 32768.0, self.EL_SAMPLE_RATE
 
     def _split(self, text):
-        t = text.replace("\n", " ")
-        return [s.strip() for s in re.split(r'(?<=[.!?])\s+', t) if len(s.strip()) > 1]
+        # OCR-Bereinigung + längenbalancierte Häppchen (kurze Sätze zusammen, lange an Kommas geteilt)
+        return segment(text)
 
-    def _consumer(self, on_progress):
-        while not self.stop_signal:
-            if self.is_paused: time.sleep(0.1); continue
+    def _consumer_loop(self):
+        reported = -1 # Generation, deren Wiedergabestart schon gemessen ist
+        wait_gen, t_wait = -1, 0.0 # gewartet wird nur innerhalb einer Generation, ab speak() bzw. dem letzten Chunk
+        while True:
             try:
-                item = self.audio_queue.get(timeout=1)
-                if item is None: break
-                data, fs, cur, tot, txt = item
-                if on_progress: on_progress(cur, tot, txt)
-                sd.play(data * self.volume, samplerate=fs)
-                sd.wait()
-            except: continue
-        self.is_playing = False
+                try: item = self.audio_queue.get(timeout=0.5)
+                except queue.Empty: item = None
+                if item is not None and not self._stale(item[0]):
+                    gen = item[0]
+                    should_stop = lambda: self._stale(gen)
+                    if item[1] is None:
+                        self.output.wait_drained(should_stop)
+                        if not self._stale(gen): self.is_playing = False
+                    else:
+                        if gen != wait_gen: wait_gen, t_wait = gen, self.speak_started
+                        tracer.record("queue_wait", t_wait, time.perf_counter() - t_wait)
+                        _, data, fs, cur, tot, txt = item
+                        self.output.start()
+                        on_progress = self.on_progress
+                        if on_progress: on_progress(cur, tot, txt)
+                        # Blockiert nur solange der Ringpuffer voll ist -> Sätze gehen lückenlos ineinander über
+                        self.output.write(data, fs, should_stop)
+                        t_wait = time.perf_counter()
+                # Veraltete Chunks (item[0] != generation) werden einfach fallen gelassen
+                gen = self.armed_gen
+                if gen == self.generation and reported != gen and self.output.first_sample_at is not None:
+                    reported = gen
+                    tracer.record("playback_start", self.speak_started, self.output.first_sample_at - self.speak_started)
+                    tracer.first_audio(self.output.first_sample_at)
+            except Exception as e:
+                self.log_to_file(f"Audio-Ausgabe Fehler: {e}")
+                self.is_playing = False
+                time.sleep(0.5)
 
     def stop(self):
         self.stop_signal = True
-        sd.stop()
-        with self.audio_queue.mutex: self.audio_queue.queue.clear()
+        with self.inflight_lock:
+            self.generation += 1 # ab hier ist alles Ältere veraltet
+            streams = list(self.inflight)
+        self.is_playing = False
+        self.is_paused = False
+        self.output.paused = False
+        self.output.armed = False # abgebrochene Generation bekommt keinen Wiedergabestart
+        self.output.first_sample_at = None
+        self.output.flush()
+        with self.audio_queue.mutex:
+            self.audio_queue.queue.clear()
+            self.audio_queue.not_full.notify_all()
+        for res in streams: self.el_client.abort(res) # blockierendes Lesen im Worker kehrt sofort zurück
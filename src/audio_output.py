@@ -0,0 +1,131 @@
+import time
+import numpy as np
+
+def prepare_pcm(data, fs, samplerate):
+    """float32 Mono in <samplerate>. Lineares Resampling reicht für Sprache (nur bei MP3-Fallback/XTTS-Mix nötig)"""
+    pcm = np.asarray(data, dtype=np.float32)
+    if pcm.ndim > 1: pcm = pcm.mean(axis=1, dtype=np.float32)
+    if fs != samplerate and len(pcm) > 1:
+        n = int(round(len(pcm) * samplerate / fs))
+        pcm = np.interp(np.linspace(0, len(pcm) - 1, n), np.arange(len(pcm)), pcm).astype(np.float32)
+    return pcm
+
+class RingBuffer:
+    """Single-Producer/Single-Consumer Ringpuffer für float32 Mono.
+    Schreib- und Lesezähler wachsen nur, jede Seite ändert nur ihren eigenen -> kein Lock im Audio-Callback."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buf = np.zeros(capacity, dtype=np.float32)
+        self.write_pos = 0
+        self.read_pos = 0
+
+    def available(self):
+        return self.write_pos - self.read_pos
+
+    def free(self):
+        return self.capacity - self.available()
+
+    def write(self, data):
+        n = min(len(data), self.free())
+        if n <= 0: return 0
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.buf[start:start + first] = data[:first]
+        if n > first: self.buf[:n - first] = data[first:n]
+        self.write_pos += n
+        return n
+
+    def read_into(self, out):
+        n = min(len(out), self.available())
+        if n <= 0: return 0
+        start = self.read_pos % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self.buf[start:start + first]
+        if n > first: out[first:n] = self.buf[:n - first]
+        self.read_pos += n
+        return n
+
+class AudioOutput:
+    """Ein einziger, dauerhaft offener Output-Stream. Lautstärke und Pause wirken im Callback,
+    Pause hält einfach den Lesezeiger an -> die Position im Satz bleibt erhalten."""
+
+    def __init__(self, samplerate=24000, buffer_seconds=0.5, blocksize=512):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.ring = RingBuffer(int(samplerate * buffer_seconds))
+        self.volume = 1.0
+        self.paused = False
+        self.stream = None
+        self.underruns = 0
+        self.latency = 0.0 # Ausgabelatenz des Geräts in s
+        self.armed = False
+        self.first_sample_at = None # perf_counter, wann das erste Sample nach arm() hörbar wurde
+        self._flush_to = None # write_pos zum Zeitpunkt von flush(), bis dahin wird im Callback verworfen
+
+    def start(self):
+        if self.stream is not None: return
+        import sounddevice as sd # erst hier, damit die Engine auch ohne Audiogerät (headless) importierbar bleibt
+        self.stream = sd.OutputStream(samplerate=self.samplerate, channels=1, dtype="float32", blocksize=self.blocksize, callback=self._callback)
+        self.stream.start()
+        try: self.latency = float(self.stream.latency)
+        except: self.latency = 0.0
+
+    def arm(self):
+        """Nächstes echtes Sample im Callback mit Zeitstempel versehen (für die Latenzmessung)"""
+        self.first_sample_at = None
+        self.armed = True
+
+    def close(self):
+        if self.stream is None: return
+        try:
+            self.stream.stop()
+            self.stream.close()
+        except: pass
+        self.stream = None
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        flush_to = self._flush_to
+        if flush_to is not None:
+            # Nur bis zur Marke verwerfen: was danach schon für den nächsten Satz geschrieben wurde, bleibt
+            self.ring.read_pos = max(self.ring.read_pos, flush_to)
+            self._flush_to = None
+        if self.paused:
+            out.fill(0)
+            return
+        n = self.ring.read_into(out)
+        if self.armed and n > 0:
+            # Nur ein Zeitstempel, keine I/O im Audio-Thread; ausgewertet wird im Consumer
+            self.first_sample_at = time.perf_counter() + self.latency
+            self.armed = False
+        if n < frames:
+            out[n:] = 0
+            if n > 0: self.underruns += 1 # Puffer lief mitten im Audio leer
+        elif status.output_underflow:
+            self.underruns += 1
+        if self.volume != 1.0:
+            np.multiply(out[:n], self.volume, out=out[:n])
+
+    def write(self, data, fs, should_stop):
+        """Schiebt den Block in den Ringpuffer, blockiert solange der voll (oder pausiert) ist."""
+        pcm = prepare_pcm(data, fs, self.samplerate)
+        pos = 0
+        while pos < len(pcm):
+            if should_stop(): return False
+            n = self.ring.write(pcm[pos:])
+            pos += n
+            if n == 0: time.sleep(0.01)
+        return True
+
+    def wait_drained(self, should_stop):
+        while self.ring.available() > 0 and not should_stop():
+            time.sleep(0.02)
+
+    def flush(self):
+        """Verwirft alles bis jetzt Geschriebene, aber noch nicht Gespielte (wird im Callback erledigt)."""
+        target = self.ring.write_pos
+        if self.stream is None or self.stream.stopped:
+            self.ring.read_pos = max(self.ring.read_pos, target)
+        else:
+            self._flush_to = target
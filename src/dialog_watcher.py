@@ -0,0 +1,158 @@
+import time
+import threading
+import numpy as np
+import cv2
+
+class DialogWatcher:
+    """Auto-Vorlesen: beobachtet nur den gelernten Dialogbereich mit wenigen Bildern pro Sekunde.
+    Pro Takt ein Region-Grab in Graustufen, Ecken-Check an der bekannten Position und ein auf 128 px verkleinertes,
+    binarisiertes Vorschaubild. Erst wenn sich der Text gegenüber dem zuletzt gelesenen ändert und danach <settle>
+    Sekunden stehen bleibt (Einblend-Animationen), wird on_change(dialog) aufgerufen.
+    Ist kein Dialog offen, wird nur selten der ganze Schirm durchsucht. Die Pausen wachsen so, dass die Rechenzeit
+    unter <cpu_budget> (Anteil eines Kerns) bleibt. on_change (OCR + Sprache) läuft in einem eigenen Thread und zählt
+    deshalb nicht zum Budget des Takts."""
+
+    THUMB_WIDTH = 128
+    MARGIN = 8 # Pixel um den Dialog, damit die Ecken-Templates beim Check ganz im Grab liegen
+
+    def __init__(self, capture, get_tracker, on_change, fps=2.0, cpu_budget=0.05, settle=0.4, min_change=0.15,
+                 relocate_interval=1.5, threshold=90, is_busy=None):
+        self.capture = capture
+        self.get_tracker = get_tracker # Funktion, damit neu gelernte Ecken sofort gelten
+        self.on_change = on_change
+        self.fps = fps
+        self.cpu_budget = cpu_budget
+        self.settle = settle
+        self.min_change = min_change # geänderte Vorschau-Pixel relativ zur Textmenge, ab dem es "neuer Text" ist
+        self.relocate_interval = relocate_interval
+        self.threshold = threshold
+        self.is_busy = is_busy or (lambda: False) # z.B. manueller Scan läuft gerade
+        self.area = None
+        self.last_read = None # Vorschau des zuletzt vorgelesenen Texts
+        self.candidate = None # geänderte Vorschau, die noch ruhig werden muss
+        self.candidate_since = 0.0
+        self.next_locate = 0.0
+        self.cpu_used = 0.0 # Sekunden Rechenzeit seit start()
+        self.ticks = 0
+        self.triggers = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._pending = None # neuester noch nicht ausgelieferter Dialog (ältere werden ersetzt)
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    # --- STEUERUNG ---
+    def start(self):
+        if self._thread is not None: return
+        stop = self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(stop,), daemon=True, name="LQAG-DialogWatcher")
+        self._thread.start()
+        threading.Thread(target=self._deliver, args=(stop,), daemon=True, name="LQAG-DialogWatcher-Callback").start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def _run(self, stop):
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            c0 = time.thread_time()
+            try:
+                if not self.is_busy(): self.tick(t0)
+            except Exception: self.area = None
+            cpu = time.thread_time() - c0
+            self.cpu_used += cpu
+            # Grundtakt 1/fps, bei teuren Takten länger, damit Rechenzeit/Periode <= Budget bleibt
+            period = max(1.0 / self.fps, cpu / max(self.cpu_budget, 1e-3))
+            stop.wait(max(0.01, period - (time.perf_counter() - t0)))
+
+    def _deliver(self, stop):
+        """Ruft on_change außerhalb des Takt-Threads auf, sonst würde dessen Rechenzeit den Watcher lange blind machen"""
+        while not stop.is_set():
+            if not self._wake.wait(0.5): continue
+            self._wake.clear()
+            with self._lock: dialog, self._pending = self._pending, None
+            if dialog is None or stop.is_set(): continue
+            try: self.on_change(dialog)
+            except Exception: pass
+
+    def _emit(self, dialog):
+        if not self.running:
+            self.on_change(dialog) # direkter tick() ohne start()
+            return
+        with self._lock: self._pending = dialog
+        self._wake.set()
+
+    # --- EIN TAKT ---
+    def thumbnail(self, gray):
+        h, w = gray.shape[:2]
+        tw = min(self.THUMB_WIDTH, w)
+        th = max(1, round(h * tw / w))
+        return cv2.resize(gray, (tw, th), interpolation=cv2.INTER_AREA) > self.threshold
+
+    @staticmethod
+    def difference(a, b):
+        """Geänderte Pixel relativ zu den Text-Pixeln (eine neue Zeile zählt auch in einem großen Fenster)"""
+        if a is None or b is None or a.shape != b.shape: return 1.0
+        ink = max(np.count_nonzero(a), np.count_nonzero(b), 1)
+        return float(np.count_nonzero(a != b)) / ink
+
+    def _locate(self, now):
+        """Teuer (ganzer Schirm) -> höchstens alle relocate_interval Sekunden, Pause wächst mit der Dauer"""
+        if now < self.next_locate: return None
+        tracker = self.get_tracker()
+        if tracker is None: return None
+        t0 = time.perf_counter()
+        area = tracker.locate(self.capture.grab(mode="gray"))
+        cost = time.perf_counter() - t0
+        self.next_locate = time.perf_counter() + max(self.relocate_interval, cost / max(self.cpu_budget, 1e-3))
+        return area
+
+    def _grab_dialog(self):
+        """Nur den Dialogbereich (+Rand) grabben und prüfen, ob die Ecken noch da sind. None = Dialog zu/verschoben."""
+        tracker = self.get_tracker()
+        if tracker is None: return None
+        x, y, w, h = self.area
+        m = self.MARGIN
+        ox, oy = max(0, x - m), max(0, y - m)
+        region = self.capture.grab((ox, oy, w + (x - ox) + m, h + (y - oy) + m), "gray")
+        if not tracker.verify(region, self.area, (ox, oy)): return None
+        return region[y - oy:y - oy + h, x - ox:x - ox + w]
+
+    def tick(self, now=None):
+        now = now if now is not None else time.perf_counter()
+        self.ticks += 1
+        if self.area is None:
+            self.area = self._locate(now)
+            if self.area is None: return False
+            self.candidate = None
+        dialog = self._grab_dialog()
+        if dialog is None:
+            # Dialog geschlossen: nächstes Öffnen ist wieder "neu", auch mit gleichem Text
+            self.area = None
+            self.last_read = None
+            self.candidate = None
+            self.next_locate = 0.0
+            return False
+
+        thumb = self.thumbnail(dialog)
+        if self.difference(thumb, self.last_read) < self.min_change:
+            self.candidate = None # nichts Neues (oder zurück zum schon gelesenen Text)
+            return False
+        if self.candidate is None or self.difference(thumb, self.candidate) >= self.min_change:
+            self.candidate, self.candidate_since = thumb, now # Text ändert sich noch -> neu abwarten
+            return False
+        if now - self.candidate_since < self.settle: return False
+
+        self.last_read, self.candidate = thumb, None
+        self.triggers += 1
+        self._emit(dialog.copy()) # Capture-Puffer wird beim nächsten Grab überschrieben
+        return True
+
+    def stats(self):
+        return {"ticks": self.ticks, "triggers": self.triggers, "cpu_s": round(self.cpu_used, 3), "area": self.area}
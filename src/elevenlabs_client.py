@@ -0,0 +1,168 @@
+import time
+import socket
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+class KeyState:
+    def __init__(self, key):
+        self.key = key
+        self.dead = False # Key ungültig -> nie wieder probieren (bis die Keys neu gesetzt werden)
+        self.cooldown_until = 0.0
+        self.failures = 0 # aufeinanderfolgende Fehler, steuert den Backoff
+        self.requests = 0
+        self.errors = 0
+        self.latency_total = 0.0
+        self.last_status = None
+
+    def label(self):
+        return f"{self.key[:5]}..."
+
+class KeyScheduler:
+    """Merkt sich pro API-Key Quota/Cooldown aus 401/402/429 und überspringt Keys, die gerade sicher nicht gehen."""
+
+    QUOTA_COOLDOWN = 3600.0 # Kontingent leer -> eine Stunde Ruhe
+    BACKOFF_BASE = 1.0
+    BACKOFF_MAX = 60.0
+
+    def __init__(self, keys=()):
+        self.lock = threading.Lock()
+        self.states = {}
+        self.order = []
+        self.set_keys(keys)
+
+    def set_keys(self, keys, revive=False):
+        """Neue/geänderte Liste oder revive (Nutzer hat die Keys neu gespeichert): tote Keys und Cooldowns zurücksetzen,
+        damit ein versehentlich als ungültig markierter Key wieder probiert wird. Statistik bleibt erhalten."""
+        with self.lock:
+            keys = list(keys)
+            if keys == self.order and not revive: return
+            self.states = {k: self.states.get(k) or KeyState(k) for k in keys}
+            self.order = keys
+            for state in self.states.values():
+                state.dead = False
+                state.cooldown_until = 0.0
+                state.failures = 0
+
+    def available(self):
+        """Keys in Nutzer-Reihenfolge, ohne tote und ohne solche im Cooldown"""
+        now = time.monotonic()
+        with self.lock:
+            return [k for k in self.order if not self.states[k].dead and self.states[k].cooldown_until <= now]
+
+    def next_ready_in(self):
+        """Sekunden bis der nächste Key wieder frei ist (None, wenn alle tot sind)"""
+        now = time.monotonic()
+        with self.lock:
+            waits = [s.cooldown_until - now for s in self.states.values() if not s.dead]
+        return max(0.0, min(waits)) if waits else None
+
+    def _backoff(self, state):
+        return min(self.BACKOFF_MAX, self.BACKOFF_BASE * (2 ** min(state.failures - 1, 10)))
+
+    def report(self, key, status, latency=None, retry_after=None, detail=""):
+        with self.lock:
+            state = self.states.get(key)
+            if state is None: return
+            state.requests += 1
+            state.last_status = status
+            if latency is not None: state.latency_total += latency
+            if status == 200:
+                state.failures = 0
+                state.cooldown_until = 0.0
+                return
+            state.errors += 1
+            state.failures += 1
+            now = time.monotonic()
+            if status == 401 and "invalid" in detail:
+                state.dead = True
+            elif status in (401, 402):
+                # ElevenLabs meldet leeres Kontingent als 401 (quota_exceeded) bzw. 402
+                state.cooldown_until = now + self.QUOTA_COOLDOWN
+            elif status == 429:
+                state.cooldown_until = now + (retry_after if retry_after else self._backoff(state))
+            else:
+                # 5xx / Netzwerk: kurzer exponentieller Backoff
+                state.cooldown_until = now + self._backoff(state)
+
+    def stats(self):
+        now = time.monotonic()
+        with self.lock:
+            return {s.label(): {"requests": s.requests, "errors": s.errors, "last_status": s.last_status, "dead": s.dead,
+                                "avg_latency_ms": round(s.latency_total / s.requests * 1000, 1) if s.requests else None,
+                                "cooldown_s": round(max(0.0, s.cooldown_until - now), 1)} for s in self.states.values()}
+
+class ElevenLabsClient:
+    """Ein Session-Objekt mit Keep-Alive-Pool für alle Requests (spart TCP+TLS pro Satz) plus Key-Scheduling."""
+
+    KEY_ERRORS = (401, 402, 429)
+
+    def __init__(self, pool_size=8, max_wait=5.0, log=None):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.scheduler = KeyScheduler()
+        self.max_wait = max_wait # so lange wird höchstens auf einen Key im Cooldown gewartet
+        self.log = log or (lambda msg: None)
+
+    @staticmethod
+    def _retry_after(res):
+        try: return float(res.headers.get("Retry-After", ""))
+        except ValueError: return None
+
+    @staticmethod
+    def _detail(res):
+        try: return str(res.json().get("detail", "")).lower()
+        except: return ""
+
+    def request(self, method, url, json_data, keys, timeout=20, stream=False, rounds=3):
+        """Wie früher: Keys der Reihe nach, bei 401/402/429 der nächste. Mit stream=True kommt die Antwort nach den
+        Headern zurück, gewechselt wird also nur vor dem ersten Byte. None, wenn kein Key durchkommt."""
+        self.scheduler.set_keys(keys)
+        for _ in range(rounds):
+            ready = self.scheduler.available()
+            if not ready:
+                wait = self.scheduler.next_ready_in()
+                if wait is None or wait > self.max_wait: return None
+                time.sleep(wait)
+                continue
+            for key in ready:
+                headers = {"xi-api-key": key, "Content-Type": "application/json"}
+                t0 = time.perf_counter()
+                try:
+                    res = self.session.request(method, url, json=json_data if method != "GET" else None, headers=headers, timeout=timeout, stream=stream)
+                except requests.RequestException as e:
+                    self.scheduler.report(key, None, time.perf_counter() - t0)
+                    self.log(f"Key {key[:5]}... Netzwerkfehler: {e}")
+                    continue
+                latency = time.perf_counter() - t0
+                if res.status_code == 200:
+                    self.scheduler.report(key, 200, latency)
+                    return res
+                if res.status_code in self.KEY_ERRORS or res.status_code >= 500:
+                    detail = self._detail(res) if res.status_code == 401 else ""
+                    self.scheduler.report(key, res.status_code, latency, self._retry_after(res), detail)
+                    self.log(f"Key {key[:5]}... leer/fehlerhaft ({res.status_code}). Versuche nächsten...")
+                    res.close()
+                    continue
+                # Andere Fehler (400, 404 ...) liegen nicht am Key -> abbrechen
+                self.scheduler.report(key, res.status_code, latency)
+                return res
+        return None
+
+    @staticmethod
+    def abort(res):
+        """Laufende Antwort von außen abbrechen: Socket zumachen, damit ein blockierendes Lesen sofort zurückkehrt"""
+        try:
+            sock = getattr(getattr(res.raw, "_connection", None), "sock", None)
+            if sock is not None: sock.shutdown(socket.SHUT_RDWR)
+        except: pass
+        try: res.close()
+        except: pass
+
+    def reset_keys(self, keys):
+        self.scheduler.set_keys(keys, revive=True)
+
+    def stats(self):
+        return self.scheduler.stats()
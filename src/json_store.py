@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import atexit
+import threading
+import weakref
+
+class JsonStore:
+    """Eine JSON-Datei als In-Memory-Dict.
+    Änderungen werden gesammelt und nach <delay> Sekunden in einem Rutsch geschrieben (Temp-Datei + os.replace,
+    damit ein Absturz nie eine halbe Datei hinterlässt). Gelesen wird von der Platte nur, wenn sich die mtime geändert hat."""
+
+    _instances = weakref.WeakSet()
+
+    def __init__(self, path, default=None, delay=1.0, indent=4, ensure_ascii=False, on_load=None, check_interval=1.0):
+        self.path = path
+        self.default = default if default is not None else {}
+        self.delay = delay
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+        self.on_load = on_load # z.B. Migration/Defaults, bekommt das frisch geladene Dict
+        self.check_interval = check_interval
+        self.lock = threading.RLock()
+        self.data = None
+        self.mtime = None
+        self.dirty = False
+        self.timer = None
+        self.last_check = 0.0
+        self.load()
+        JsonStore._instances.add(self)
+
+    def load(self):
+        with self.lock:
+            data = None
+            try:
+                st = os.stat(self.path)
+                with open(self.path, "r", encoding="utf-8") as f: data = json.load(f)
+                self.mtime = st.st_mtime_ns
+            except: self.mtime = None
+            if not isinstance(data, type(self.default)): data = json.loads(json.dumps(self.default))
+            if self.on_load: data = self.on_load(data) or data
+            self.data = data
+            self.dirty = False
+            self.last_check = time.monotonic()
+            return data
+
+    def reload_if_changed(self):
+        """Neu laden, falls jemand die Datei von außen geändert hat. Höchstens alle check_interval Sekunden ein stat()."""
+        now = time.monotonic()
+        if now - self.last_check < self.check_interval: return False
+        self.last_check = now
+        try: mtime = os.stat(self.path).st_mtime_ns
+        except OSError: return False
+        with self.lock:
+            if self.dirty or mtime == self.mtime: return False
+            self.load()
+            return True
+
+    def get(self):
+        self.reload_if_changed()
+        return self.data
+
+    # --- ÄNDERN (immer über diese Methoden, damit der Writer-Thread einen konsistenten Stand sieht) ---
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.mark_dirty()
+
+    def delete(self, key):
+        with self.lock:
+            if key in self.data:
+                del self.data[key]
+                self.mark_dirty()
+
+    def replace(self, data):
+        with self.lock:
+            self.data = data
+            self.mark_dirty()
+
+    def mark_dirty(self):
+        with self.lock:
+            self.dirty = True
+            if self.timer is None:
+                self.timer = threading.Timer(self.delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.dirty: return True
+            try:
+                payload = json.dumps(self.data, indent=self.indent, ensure_ascii=self.ensure_ascii)
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp = f"{self.path}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+                self.mtime = os.stat(self.path).st_mtime_ns
+                self.dirty = False
+                return True
+            except: return False
+
+    @classmethod
+    def flush_all(cls):
+        for store in list(cls._instances): store.flush()
+
+atexit.register(JsonStore.flush_all)
@@ -0,0 +1,84 @@
+import os
+import threading
+
+class LogTailer:
+    """Liest nur neu angehängte Zeilen einer wachsenden Log-Datei (z.B. Script.log des Plugins).
+    Merkt sich den Byte-Offset, erkennt Kürzen (Datei kleiner als Offset) und Rotation (neue Datei-ID).
+    Wird die Datei an Ort und Stelle neu geschrieben (target.txt: ein Name ohne Newline), ändert sich nur st_mtime:
+    dann wird die unvollständige letzte Zeile bzw. bei gleicher/kleinerer Größe die ganze Datei neu gelesen."""
+
+    def __init__(self, path, tail_bytes=4096, encoding="utf-8"):
+        self.path = path
+        self.tail_bytes = tail_bytes
+        self.encoding = encoding
+        self.offset = None
+        self.file_id = None
+        self.mtime = None
+        self.partial = b""
+        self.lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def read_new_lines(self, include_partial=False):
+        """Neue, vollständige Zeilen seit dem letzten Aufruf. include_partial liefert zusätzlich eine
+        noch nicht mit Zeilenumbruch abgeschlossene letzte Zeile (z.B. target.txt ohne Newline)."""
+        with self.lock:
+            try: st = os.stat(self.path)
+            except OSError: return []
+            # Unter Windows ist st_ctime die Erstellungszeit -> erkennt auch neu angelegte Dateien mit gleicher ID
+            file_id = (st.st_dev, st.st_ino, st.st_ctime_ns if os.name == "nt" else 0)
+
+            skip_first = False
+            if self.offset is None:
+                # Erster Blick: nur das Ende lesen, die Historie interessiert nicht
+                self.offset = max(0, st.st_size - self.tail_bytes)
+                skip_first = self.offset > 0
+                self.partial = b""
+            elif file_id != self.file_id or st.st_size < self.offset:
+                # Rotiert oder gekürzt -> neue Datei von vorne
+                self.offset = 0
+                self.partial = b""
+            elif st.st_mtime_ns != self.mtime and (st.st_size <= self.offset or self.partial):
+                # Überschrieben: Seek-to-Offset taugt nur für angehängte, abgeschlossene Zeilen.
+                # Die angefangene Zeile ab ihrem Anfang neu lesen (bei target.txt = ab 0), sonst alles von vorne.
+                self.offset = self.offset - len(self.partial) if st.st_size > self.offset else 0
+                self.partial = b""
+                if self.offset == 0: skip_first = False
+            self.file_id = file_id
+            self.mtime = st.st_mtime_ns
+            if st.st_size == self.offset:
+                if include_partial and self.partial.strip():
+                    return [self.partial.decode(self.encoding, errors="ignore").strip("\r")]
+                return []
+
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(self.offset)
+                    data = f.read(st.st_size - self.offset)
+            except OSError: return []
+            self.offset += len(data)
+
+            chunks = (self.partial + data).split(b"\n")
+            self.partial = chunks.pop() # unvollständige letzte Zeile für den nächsten Aufruf
+            if skip_first and chunks: chunks.pop(0) # angeschnittene Zeile am Tail-Anfang
+            if include_partial and self.partial: chunks.append(self.partial)
+            lines = [c.decode(self.encoding, errors="ignore").strip("\r") for c in chunks]
+            return [l for l in lines if l.strip()]
+
+    # --- OPTIONALER HINTERGRUND-WATCHER ---
+    def start(self, callback, interval=0.2):
+        """Pollt die Datei (nur os.stat, solange nichts neu ist) und ruft callback(lines) bei neuen Zeilen."""
+        if self._watcher is not None: return
+        stop = self._stop = threading.Event() # eigenes Event je Thread, damit ein alter Watcher sicher endet
+        def run():
+            while not stop.wait(interval):
+                lines = self.read_new_lines()
+                if lines:
+                    try: callback(lines)
+                    except: pass
+        self._watcher = threading.Thread(target=run, daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        self._watcher = None
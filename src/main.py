@@ -6,14 +6,21 @@ import time
 import tkinter as tk
 from tkinter import messagebox, ttk, filedialog
 import ctypes
-import numpy as np
-import cv2
-import pyautogui
+import multiprocessing
 import keyboard
-import easyocr
 
+T_START = time.perf_counter()
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Schwere Module (cv2, easyocr, torch) werden erst im Warm-up Thread geladen
+cv2 = None
+
+def load_vision_modules():
+    global cv2
+    if cv2 is None:
+        import cv2 as _cv2
+        cv2 = _cv2
+
 try:
     ctypes.windll.shcore.SetProcessDpiAwareness(1)
 except: pass
@@ -34,11 +41,18 @@ class App:
         from settings_manager import SettingsManager
         from audio_engine import AudioEngine
         from screen_tool import SnippingTool
+        from tracing import tracer
         self.npc_manager = NpcManager()
         self.settings_mgr = SettingsManager(self.root_dir)
         self.audio = AudioEngine()
-        self.reader = easyocr.Reader(['de', 'en'], gpu=True)
+        self.pipeline = None
+        self.watcher = None
+        self.ready = False
+        self.pending_scan = False
+        self.timings = {}
         self.SnippingTool = SnippingTool
+        self.tracer = tracer
+        self.configure_trace()
         
         self.root = tk.Tk()
         self.root.title("LQAG Vorleser V26 (Multi-Account)")
@@ -54,12 +68,84 @@ class App:
 
         self.setup_ui()
         self.register_hotkeys()
+        if self.settings_mgr.get("watch_target"): self.npc_manager.start_watching(self.settings_mgr.get("plugin_target_path"))
         self.is_scanning = False
         self.template_tl = None
+        self.tracker = None
         
-        self.root.after(500, self.load_cached_templates)
+        self.root.after(0, lambda: self.mark_timing("ui"))
+        self.root.after(self.UI_TICK_MS, self._ui_tick, time.perf_counter() + self.UI_TICK_MS / 1000)
+        threading.Thread(target=self._warmup, daemon=True).start()
         self.root.mainloop()
 
+    # --- WARM-UP (Hintergrund) ---
+    def mark_timing(self, stage):
+        ms = (time.perf_counter() - T_START) * 1000
+        self.timings[stage] = ms
+        try:
+            ts = datetime.datetime.now().strftime("%H:%M:%S")
+            with open(os.path.join(self.debug_dir, "startup_times.log"), "a", encoding="utf-8") as f:
+                f.write(f"[{ts}] {stage}: {ms:.0f} ms\n")
+        except: pass
+
+    def configure_trace(self):
+        # Trace-Datei nur im Debug-Modus (*.json = Chrome-Trace, sonst JSONL), Perzentile laufen immer mit
+        name = self.settings_mgr.get("trace_file")
+        self.tracer.configure(os.path.join(self.debug_dir, name) if self.settings_mgr.get("debug_mode") and name else None)
+
+    UI_TICK_MS = 50
+
+    def _ui_tick(self, due):
+        # Wie viel später als geplant kommt der Mainloop dran? Gemessen nur, während gescannt/gesprochen wird
+        now = time.perf_counter()
+        if self.is_scanning or self.audio.is_playing: self.tracer.record("ui_lag", due, max(0.0, now - due))
+        self.root.after(self.UI_TICK_MS, self._ui_tick, now + self.UI_TICK_MS / 1000)
+
+    def show_timings(self):
+        underruns = f"\n\nAudio-Underruns seit Start: {self.audio.output.underruns}"
+        messagebox.showinfo("Latenzen (ms, letzte Durchläufe)", self.tracer.format_summary() + underruns)
+
+    def set_status(self, text):
+        self.root.after(0, lambda: self.lbl_status.config(text=text))
+
+    def _warmup(self):
+        try:
+            self.set_status("Lade Bildverarbeitung...")
+            load_vision_modules()
+            from ocr_cache import OcrCache
+            from pipeline import Pipeline, EasyOcrBackend
+            from screen_capture import create_capture
+            self.pipeline = Pipeline(capture=create_capture(self.settings_mgr.get("capture_backend")), ocr=EasyOcrBackend(), tts=self.audio, npc_manager=self.npc_manager,
+                                     settings=self.settings_mgr.get_all, ocr_cache=OcrCache(), debug_dir=self.debug_dir)
+            self.root.after(0, self.load_cached_templates)
+
+            self.set_status("Lade Texterkennung (OCR)...")
+            if self.settings_mgr.get("ocr_out_of_process"):
+                from ocr_worker import OcrWorker
+                try: self.pipeline.ocr = OcrWorker().load()
+                except Exception as e: self.set_status(f"OCR-Prozess nicht verfügbar ({e}), lade im Programm...")
+            self.pipeline.ocr.load()
+            self.mark_timing("ocr_ready")
+
+            self.ready = True
+            self.root.after(0, self.update_watcher)
+            self._replay_pending_scan() # nicht erst nach dem XTTS Warm-up
+            if not self.settings_mgr.get("use_elevenlabs"):
+                self.set_status("Lade Stimme (XTTS)...")
+                self.audio.warmup()
+                self.mark_timing("tts_ready")
+            self.set_status("Bereit.")
+        except Exception as e:
+            self.ready = self.pipeline is not None and self.pipeline.ocr.ready
+            self.set_status(f"Warm-up Fehler: {e}")
+        self._replay_pending_scan()
+
+    def _replay_pending_scan(self):
+        # Während des Ladens gedrückte Hotkeys nachholen
+        if self.ready and self.pending_scan:
+            self.pending_scan = False
+            self.root.after(0, self.scan_once)
+
     def setup_ui(self):
         self.nb = ttk.Notebook(self.root)
         self.nb.pack(fill=tk.BOTH, expand=True)
@@ -117,8 +203,17 @@ class App:
         
         tk.Button(c, text="🚀 Bibliothek dynamisch aufbauen", command=self.start_library_generation, bg=COLORS["success"], fg="white", pady=10).pack(fill=tk.X, pady=20)
         
+        self.chk_auto = tk.BooleanVar(value=self.settings_mgr.get("auto_read"))
+        def toggle_auto():
+            self.settings_mgr.set("auto_read", self.chk_auto.get()); self.update_watcher()
+        tk.Checkbutton(c, text="Automatisch vorlesen (Quest-Fenster beobachten, kein Hotkey nötig)", variable=self.chk_auto, command=toggle_auto, bg=COLORS["bg"], fg="#ccc", selectcolor=COLORS["bg"]).pack(anchor="w")
+
         self.chk_db = tk.BooleanVar(value=self.settings_mgr.get("debug_mode"))
-        tk.Checkbutton(c, text="Debug-Modus (Bilder/Text speichern)", variable=self.chk_db, command=lambda: self.settings_mgr.set("debug_mode", self.chk_db.get()), bg=COLORS["bg"], fg="#ccc", selectcolor=COLORS["bg"]).pack(anchor="w")
+        def toggle_debug():
+            self.settings_mgr.set("debug_mode", self.chk_db.get()); self.configure_trace()
+        f_db = tk.Frame(c, bg=COLORS["bg"]); f_db.pack(fill=tk.X)
+        tk.Checkbutton(f_db, text="Debug-Modus (Bilder/Text/Trace speichern)", variable=self.chk_db, command=toggle_debug, bg=COLORS["bg"], fg="#ccc", selectcolor=COLORS["bg"]).pack(side=tk.LEFT)
+        tk.Button(f_db, text="⏱ Latenzen", command=self.show_timings, bg=COLORS["panel"], fg="white", relief="flat").pack(side=tk.RIGHT)
         
         vol_f = tk.Frame(c, bg=COLORS["bg"]); vol_f.pack(fill=tk.X, pady=10)
         tk.Label(vol_f, text="Vol:", bg=COLORS["bg"], fg="#ccc").pack(side=tk.LEFT)
@@ -129,12 +224,14 @@ class App:
         # String in Liste umwandeln, Leerzeichen entfernen
         keys = [k.strip() for k in raw.split(',') if k.strip()]
         self.settings_mgr.set("elevenlabs_api_keys", keys)
+        self.audio.reset_elevenlabs_keys(keys)
         messagebox.showinfo("Gespeichert", f"{len(keys)} API Keys gespeichert!")
 
     def choose_plugin_file(self):
         file_path = filedialog.askopenfilename(filetypes=[("Text Dateien", "*.txt"), ("Alle Dateien", "*.*")])
         if file_path:
             self.settings_mgr.set("plugin_target_path", file_path)
+            if self.settings_mgr.get("watch_target"): self.npc_manager.start_watching(file_path)
             self.ent_plug.delete(0, tk.END)
             self.ent_plug.insert(0, file_path)
 
@@ -164,32 +261,60 @@ class App:
     def start_library_generation(self):
         threading.Thread(target=self._run_lib, daemon=True).start()
     def _run_lib(self):
-        self.audio.generate_voice_library(self.settings_mgr.get_all(), self.update_progress)
-        self.lbl_status.config(text="Bibliothek fertig!")
+        def progress(cur, tot, txt=""):
+            self.update_progress(cur, tot, txt); self.set_status(txt)
+        ok = self.audio.generate_voice_library(self.settings_mgr.get_all(), progress)
+        self.set_status("Bibliothek fertig!" if ok else "Bibliothek: keine Stimmen geladen.")
 
     def scan_once(self):
+        if not self.ready:
+            self.pending_scan = True; self.lbl_status.config(text="Lädt noch... wird danach vorgelesen."); return
         if self.is_scanning or self.template_tl is None: return
+        self.tracer.begin("hotkey")
         self.is_scanning = True; threading.Thread(target=self._run_scan, daemon=True).start()
         
+    # --- AUTO-VORLESEN ---
+    def update_watcher(self):
+        """Watcher an, wenn eingeschaltet, OCR bereit und Ecken gelernt; sonst aus"""
+        want = bool(self.settings_mgr.get("auto_read")) and self.ready and self.tracker is not None
+        if not want:
+            if self.watcher is not None: self.watcher.stop()
+            return
+        if self.watcher is None:
+            from dialog_watcher import DialogWatcher
+            self.watcher = DialogWatcher(self.pipeline.capture, lambda: self.tracker, self._auto_read, is_busy=lambda: self.is_scanning)
+        self.watcher.fps = float(self.settings_mgr.get("auto_read_fps"))
+        self.watcher.cpu_budget = float(self.settings_mgr.get("auto_read_cpu_budget"))
+        self.watcher.start()
+
+    def _auto_read(self, dialog):
+        # Läuft im Watcher-Thread; Fenster muss nicht versteckt werden, gegrabbt wurde nur der Dialog
+        if self.is_scanning: return
+        self.is_scanning = True
+        self.tracer.begin("auto_read")
+        try:
+            target, v_ref = self.pipeline.resolve_voice()
+            self.root.after(0, lambda: self.lbl_target.config(text=target))
+            on_text = lambda name, txt: self.root.after(0, lambda: self.display_result(name, txt))
+            self.pipeline.process(dialog, voice=(target, v_ref), on_text=on_text, on_progress=self.update_progress, located=True)
+        except: pass
+        finally: self.is_scanning = False
+
     def _run_scan(self):
         db = self.settings_mgr.get("debug_mode")
-        plug_path = self.settings_mgr.get("plugin_target_path")
         try:
-            self.npc_manager.update(plug_path)
-            target = self.npc_manager.current_target; v_ref = self.npc_manager.get_voice_path()
+            target, v_ref = self.pipeline.resolve_voice()
             self.root.after(0, lambda: self.lbl_target.config(text=target))
-            self.root.after(0, self.root.withdraw); time.sleep(0.3); area = self.scan_for_window(); self.root.after(0, self.root.deiconify)
-            if not area: self.is_scanning = False; return
-            img = np.array(pyautogui.screenshot(region=area))
-            if db: cv2.imwrite(os.path.join(self.debug_dir, "last_scan_raw.jpg"), cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
-            proc = cv2.threshold(cv2.cvtColor(cv2.resize(cv2.cvtColor(img, cv2.COLOR_RGB2BGR), None, fx=3, fy=3), cv2.COLOR_BGR2GRAY), 90, 255, cv2.THRESH_TOZERO)[1]
-            if db: cv2.imwrite(os.path.join(self.debug_dir, "last_scan_processed.jpg"), proc)
-            txt = " ".join(self.reader.readtext(proc, detail=0, paragraph=True)).strip()
-            if db: 
-                with open(os.path.join(self.debug_dir, "last_recognized_text.txt"), "w", encoding="utf-8") as f: f.write(txt)
-            if len(txt) > 3:
-                self.root.after(0, lambda: self.display_result(target, txt))
-                self.audio.speak(txt, v_ref, self.settings_mgr.get_all(), on_progress=self.update_progress)
+            # Ein Screenshot für Suche UND OCR
+            with self.tracer.span("hide_window"): self.root.after(0, self.root.withdraw); time.sleep(0.3)
+            with self.tracer.span("screenshot"): scr = self.grab_screen()
+            self.root.after(0, self.root.deiconify)
+            on_text = lambda name, txt: self.root.after(0, lambda: self.display_result(name, txt))
+            res = self.pipeline.process(scr, voice=(target, v_ref), on_text=on_text, on_progress=self.update_progress)
+            if res.area is None:
+                self.set_status(f"Quest-Fenster nicht gefunden (Score {res.score:.2f})."); return
+            latency = self.npc_manager.target_latency()
+            if db and res.text and latency is not None: self.npc_manager.log_debug(f"Plugin-Meldung -> Sprachstart: {latency * 1000:.0f} ms")
         except: pass
         finally: self.is_scanning = False
 
@@ -200,26 +325,36 @@ class App:
     def _gui_up(self, cur, tot):
         self.pb["maximum"] = tot; self.pb["value"] = cur; self.lbl_pb.config(text=f"{cur} / {tot}")
         if cur >= tot: self.lbl_status.config(text="Audio wurde Erstellt."); self.pb["value"] = 0
-    def stop_audio(self): self.audio.stop(); self.pb["value"] = 0; self.lbl_status.config(text="Abgebrochen.")
+    def stop_audio(self): self.audio.stop(); self.pb["value"] = 0; self.lbl_status.config(text="Abgebrochen."); self.btn_p.config(bg=COLORS["warning"], text="⏸")
     def toggle_pause(self): 
         p = self.audio.toggle_pause(); self.btn_p.config(bg=COLORS["success"] if p else COLORS["warning"], text="▶" if p else "⏸")
     def start_learning_sequence(self):
+        if self.pipeline is None: self.lbl_status.config(text="Lädt noch..."); return
         self.root.withdraw(); time.sleep(0.2); self.SnippingTool(self.root, self._step1)
     def _step1(self, x, y, w, h):
-        self.template_tl = cv2.cvtColor(np.array(pyautogui.screenshot(region=(x, y, w, h))), cv2.COLOR_RGB2BGR)
+        self.template_tl = self.pipeline.capture.grab((x, y, w, h), "bgr").copy()
         self.root.deiconify(); messagebox.showinfo("2", "UNTEN-RECHTS"); self.root.withdraw(); self.SnippingTool(self.root, self._step2)
     def _step2(self, x, y, w, h):
-        self.template_br = cv2.cvtColor(np.array(pyautogui.screenshot(region=(x, y, w, h))), cv2.COLOR_RGB2BGR)
+        self.template_br = self.pipeline.capture.grab((x, y, w, h), "bgr").copy()
         self.root.deiconify(); cv2.imwrite(os.path.join(self.cache_dir, "last_tl.png"), self.template_tl); cv2.imwrite(os.path.join(self.cache_dir, "last_br.png"), self.template_br)
+        self.create_tracker()
         if self.scan_for_window(): self.btn_r.config(state=tk.NORMAL); self.lbl_status.config(text="Gelernt!")
     def load_cached_templates(self):
         p = os.path.join(self.cache_dir, "last_tl.png")
-        if os.path.exists(p): self.template_tl = cv2.imread(p); self.template_br = cv2.imread(os.path.join(self.cache_dir, "last_br.png")); self.btn_r.config(state=tk.NORMAL); self.lbl_status.config(text="Bereit.")
-    def scan_for_window(self):
-        if self.template_tl is None: return None
-        scr = cv2.cvtColor(np.array(pyautogui.screenshot()), cv2.COLOR_RGB2BGR)
-        tl = cv2.minMaxLoc(cv2.matchTemplate(scr, self.template_tl, cv2.TM_CCOEFF_NORMED))[3]
-        br = cv2.minMaxLoc(cv2.matchTemplate(scr, self.template_br, cv2.TM_CCOEFF_NORMED))[3]
-        return (tl[0], tl[1], (br[0] + self.template_br.shape[1]) - tl[0], (br[1] + self.template_br.shape[0]) - tl[1])
-
-if __name__ == "__main__": App()
+        if os.path.exists(p): self.template_tl = cv2.imread(p); self.template_br = cv2.imread(os.path.join(self.cache_dir, "last_br.png")); self.create_tracker(); self.btn_r.config(state=tk.NORMAL)
+    def create_tracker(self):
+        from window_tracker import WindowTracker
+        self.tracker = WindowTracker.from_files(os.path.join(self.cache_dir, "last_tl.png"), os.path.join(self.cache_dir, "last_br.png"), min_score=float(self.settings_mgr.get("match_threshold")))
+        self.pipeline.tracker = self.tracker
+        if self.watcher is not None: self.watcher.area = None # neue Ecken -> neu suchen
+        self.update_watcher()
+    def grab_screen(self):
+        return self.pipeline.capture.grab(mode=self.pipeline.CAPTURE_MODE)
+    def scan_for_window(self, scr=None):
+        if self.tracker is None: return None
+        if scr is None: scr = self.grab_screen()
+        return self.pipeline.locate(scr)[0]
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    App()
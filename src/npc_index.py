@@ -0,0 +1,173 @@
+import os
+import re
+import sys
+import time
+import pickle
+import unicodedata
+from array import array
+from collections import Counter, namedtuple
+
+INDEX_VERSION = 1
+SOURCES = (("npc_lists.txt", "de"), ("npcsEN.txt", "en"), ("npcsFR.txt", "fr"))
+TAG_RE = re.compile(r"^(.*?)\s*\[([a-z]+)\]\s*$")
+
+NpcEntry = namedtuple("NpcEntry", "name gender flags lang score")
+
+def normalize(name):
+    """Schlüssel für Vergleiche: klein, ohne Akzente/Satzzeichen, einfache Leerzeichen."""
+    t = unicodedata.normalize("NFKD", name.casefold())
+    t = "".join(c for c in t if not unicodedata.combining(c))
+    t = t.replace("œ", "oe").replace("æ", "ae").replace("ß", "ss")
+    return " ".join(re.sub(r"[^\w\s]", " ", t).split())
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class NpcIndex:
+    """Vorgebauter Index über alle NPC-Listen (de/en/fr).
+    Exakte Treffer über den normalisierten Namen in O(1), Beinahe-Treffer (Titel, Tippfehler, Akzente)
+    über Trigramm-Postings mit Dice-Ähnlichkeit. Wird als Binärdatei gecacht und bei geänderten Listen neu gebaut."""
+
+    def __init__(self, names, genders, flags, langs, keys, postings, tri_counts, signature=None):
+        self.names = names # id -> Originalname
+        self.genders = genders # id -> "m" / "f" / "?"
+        self.flags = flags # id -> restliche Tag-Buchstaben (z.B. "v", "n")
+        self.langs = langs # id -> "de" / "en" / "fr"
+        self.keys = keys # normalisierter Name -> id
+        self.postings = postings # trigramm -> array("I") von ids
+        self.tri_counts = tri_counts # id -> Anzahl Trigramme
+        self.signature = signature
+
+    # --- AUFBAU ---
+    @staticmethod
+    def signature_of(resources_dir):
+        sig = [INDEX_VERSION]
+        for fname, _ in SOURCES:
+            p = os.path.join(resources_dir, fname)
+            if os.path.exists(p):
+                st = os.stat(p)
+                sig.append((fname, st.st_size, st.st_mtime_ns))
+        return tuple(sig)
+
+    @classmethod
+    def build(cls, resources_dir):
+        names, genders, flags, langs, tri_counts = [], [], [], [], array("I")
+        keys, postings = {}, {}
+        for fname, lang in SOURCES:
+            p = os.path.join(resources_dir, fname)
+            if not os.path.exists(p): continue
+            with open(p, "r", encoding="utf-8", errors="ignore") as f:
+                lines = f.read().splitlines()
+            for line in lines:
+                line = line.strip()
+                if not line: continue
+                m = TAG_RE.match(line)
+                name, tag = (m.group(1).strip(), m.group(2)) if m else (line, "")
+                key = normalize(name)
+                if not key or key in keys: continue # erste Liste gewinnt (de vor en vor fr)
+                gender = next((c for c in tag if c in "mf"), "?")
+                idx = len(names)
+                names.append(name)
+                genders.append(gender)
+                flags.append("".join(c for c in tag if c not in "mf"))
+                langs.append(lang)
+                keys[key] = idx
+                grams = trigrams(key)
+                tri_counts.append(len(grams))
+                for g in grams: postings.setdefault(g, array("I")).append(idx)
+        return cls(names, "".join(genders), flags, langs, keys, postings, tri_counts, cls.signature_of(resources_dir))
+
+    @classmethod
+    def load(cls, resources_dir, cache_path):
+        """Lädt den Binär-Index; baut ihn neu, wenn er fehlt oder die Listen sich geändert haben."""
+        sig = cls.signature_of(resources_dir)
+        try:
+            with open(cache_path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("signature") == sig:
+                return cls(**data)
+        except: pass
+        index = cls.build(resources_dir)
+        index.save(cache_path)
+        return index
+
+    def save(self, path):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = {"names": self.names, "genders": self.genders, "flags": self.flags, "langs": self.langs, "keys": self.keys,
+                    "postings": self.postings, "tri_counts": self.tri_counts, "signature": self.signature}
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f: pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except: pass
+
+    # --- ABFRAGE ---
+    def _entry(self, idx, score):
+        return NpcEntry(self.names[idx], self.genders[idx], self.flags[idx], self.langs[idx], score)
+
+    def lookup(self, name, min_score=0.6):
+        key = normalize(name)
+        if not key: return None
+        idx = self.keys.get(key)
+        if idx is not None: return self._entry(idx, 1.0)
+        grams = trigrams(key)
+        counts = Counter()
+        for g in grams:
+            ids = self.postings.get(g)
+            if ids is not None: counts.update(ids)
+        best, best_score = None, 0.0
+        for idx, common in counts.items():
+            score = 2.0 * common / (len(grams) + self.tri_counts[idx])
+            if score > best_score: best, best_score = idx, score
+        if best is None or best_score < min_score: return None
+        return self._entry(best, best_score)
+
+    def gender(self, name, default="m"):
+        entry = self.lookup(name)
+        if entry is None or entry.gender == "?": return default
+        return entry.gender
+
+    def __len__(self):
+        return len(self.names)
+
+# --- BENCHMARK: python src/npc_index.py ---
+def _legacy_load(path):
+    """Der alte Parser aus NpcManager.load_npc_database (nur npc_lists.txt, Regex pro Zeile)."""
+    db = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            match = re.search(r"^(.*?)\s*\[([mf])\]", line.strip())
+            if match:
+                name, gender = match.groups()
+                db[name.strip().lower()] = gender.lower()
+    return db
+
+def _bench(resources_dir, cache_path):
+    def timed(fn, n=1):
+        t = time.perf_counter()
+        for _ in range(n): r = fn()
+        return r, (time.perf_counter() - t) * 1000 / n
+
+    legacy, t_legacy = timed(lambda: _legacy_load(os.path.join(resources_dir, "npc_lists.txt")), 5)
+    index, t_build = timed(lambda: NpcIndex.build(resources_dir))
+    index.save(cache_path)
+    _, t_load = timed(lambda: NpcIndex.load(resources_dir, cache_path), 5)
+    print(f"Kaltstart alt (nur de, Regex):    {t_legacy:8.1f} ms  ({len(legacy)} Namen)")
+    print(f"Index bauen (de/en/fr):           {t_build:8.1f} ms  ({len(index)} Namen)")
+    print(f"Index laden (Binär):              {t_load:8.1f} ms")
+
+    probes = list(legacy)[:2000]
+    _, t_old = timed(lambda: [legacy.get(p, "m") for p in probes], 20)
+    _, t_new = timed(lambda: [index.lookup(p) for p in probes], 20)
+    print(f"Exakt, 2000 Abfragen alt / neu:   {t_old:8.2f} ms / {t_new:.2f} ms")
+    fuzzy = ["hugo baumschneider", "Karlo Schwarzhein", "RUBINIA HOHLUFER", "Ponto Hopfenbluete", "Fogon Pale"]
+    _, t_fuzzy = timed(lambda: [index.lookup(p) for p in fuzzy], 20)
+    print(f"Unscharf, {len(fuzzy)} Abfragen:              {t_fuzzy:8.2f} ms")
+    for p in fuzzy:
+        print(f"  {p!r:24} alt: {legacy.get(p.lower(), '-')}   neu: {index.lookup(p)}")
+
+if __name__ == "__main__":
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    res = sys.argv[1] if len(sys.argv) > 1 else os.path.join(root, "resources")
+    _bench(res, os.path.join(res, "cache", "npc_index.bin"))
@@ -1,8 +1,26 @@
-import json
 import os
-import random
-import re
 import datetime
+import time
+import threading
+from collections import Counter, namedtuple
+from npc_index import NpcIndex
+from log_tailer import LogTailer
+from json_store import JsonStore
+from voice_pool import VoicePool
+
+# Eine Zeile des LQAG Reporters: LQAG|<version>|<unix-zeit>|<spielzeit>|<entity-id>|<name>
+TargetRecord = namedtuple("TargetRecord", "name entity_id timestamp game_time received")
+
+def parse_target_line(line, received=None):
+    """Strukturierte Reporter-Zeile -> TargetRecord, sonst None (Script.log kann Präfixe/fremde Ausgaben enthalten)"""
+    i = line.find("LQAG|")
+    if i < 0: return None
+    parts = line[i:].rstrip("\r\n").split("|", 5)
+    if len(parts) != 6 or not parts[5].strip(): return None
+    try:
+        ts, gt = float(parts[2]), float(parts[3])
+    except ValueError: return None
+    return TargetRecord(parts[5].strip(), parts[4].strip() or None, ts, gt, received if received is not None else time.time())
 
 class NpcManager:
     def __init__(self):
@@ -10,7 +28,8 @@ class NpcManager:
         self.root_dir = os.path.dirname(self.base_dir)
         self.assignments_path = os.path.join(self.root_dir, "resources", "voices-assignments.json")
         self.generated_dir = os.path.join(self.root_dir, "resources", "voices", "generated")
-        self.npc_list_path = os.path.join(self.root_dir, "resources", "npc_lists.txt")
+        self.resources_dir = os.path.join(self.root_dir, "resources")
+        self.npc_index_path = os.path.join(self.root_dir, "resources", "cache", "npc_index.bin")
         self.default_target_path = os.path.join(self.root_dir, "resources", "npc_lists", "target.txt")
         
         self.debug_log_path = os.path.join(self.root_dir, "debug", "npc_gender_log.txt")
@@ -18,8 +37,17 @@ class NpcManager:
             os.makedirs(os.path.dirname(self.debug_log_path))
 
         self.current_target = "Unbekannt"
-        self.npc_database = self.load_npc_database()
-        self.assignments = self.load_assignments()
+        self.current_record = None
+        self.structured = False # sobald strukturierte Zeilen kommen, werden freie Zeilen ignoriert
+        self.clock_offset = None # Unix-Zeit minus Spielzeit, siehe event_time()
+        self.entity_voices = {} # entity-id -> Stimme (nur für diese Sitzung)
+        self.tailer = None
+        self.watch_interval = None # gesetzt, solange start_watching() aktiv ist
+        self.target_lock = threading.Lock()
+        self.npc_index = self.load_npc_index()
+        self.assignments_store = JsonStore(self.assignments_path, default={}, indent=4, ensure_ascii=False)
+        self.voice_pool = VoicePool(self.generated_dir, os.path.join(self.generated_dir, "voice_map.json"))
+        self.balance_voices = False # True: wenig genutzte Stimmen bevorzugen (dann nicht mehr rechnerübergreifend gleich)
 
     def log_debug(self, msg):
         try:
@@ -28,51 +56,94 @@ class NpcManager:
                 f.write(f"[{ts}] {msg}\n")
         except: pass
 
-    def load_npc_database(self):
-        db = {}
-        if os.path.exists(self.npc_list_path):
-            try:
-                with open(self.npc_list_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        match = re.search(r"^(.*?)\s*\[([mf])\]", line.strip())
-                        if match:
-                            name, gender = match.groups()
-                            db[name.strip().lower()] = gender.lower()
-            except: pass
-        return db
-
-    def load_assignments(self):
-        if os.path.exists(self.assignments_path):
-            try:
-                with open(self.assignments_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except: return {}
-        return {}
+    def load_npc_index(self):
+        # Binär-Index über npc_lists/npcsEN/npcsFR, wird nur bei geänderten Listen neu gebaut
+        try: return NpcIndex.load(self.resources_dir, self.npc_index_path)
+        except: return NpcIndex([], "", [], [], {}, {}, [])
+
+    def lookup_gender(self, name):
+        entry = self.npc_index.lookup(name)
+        if entry is None: return "m"
+        if entry.score < 1.0:
+            self.log_debug(f"Unscharfer Treffer: '{name}' -> '{entry.name}' ({entry.lang}, {entry.score:.2f})")
+        return entry.gender if entry.gender in ("m", "f") else "m"
+
+    @property
+    def assignments(self):
+        return self.assignments_store.get()
 
     def save_assignments(self):
-        try:
-            with open(self.assignments_path, "w", encoding="utf-8") as f:
-                json.dump(self.assignments, f, indent=4, ensure_ascii=False)
-        except: pass
+        self.assignments_store.flush()
 
-    def update(self, custom_path=""):
+    def _tailer_for(self, custom_path=""):
         file_to_read = custom_path if (custom_path and os.path.exists(custom_path)) else self.default_target_path
-        if os.path.exists(file_to_read):
-            try:
-                with open(file_to_read, "r", encoding="utf-8", errors="ignore") as f:
-                    content = f.read().strip()
-                    if content:
-                        lines = content.splitlines()
-                        last_entry = lines[-1].strip()
-                        if last_entry and last_entry != self.current_target:
-                            self.current_target = last_entry
-                            self.log_debug(f"Neuer NPC erkannt: '{self.current_target}'")
-            except: pass
+        if self.tailer is None or self.tailer.path != file_to_read:
+            if self.tailer is not None: self.tailer.stop()
+            self.tailer = LogTailer(file_to_read)
+            # Anderer Pfad (z.B. Script.log taucht erst nach dem Start auf): Watcher auf der neuen Datei weiterführen
+            if self.watch_interval is not None: self.tailer.start(self.consume_lines, self.watch_interval)
+        return self.tailer
+
+    def update(self, custom_path=""):
+        # Nur neu angehängte Bytes lesen statt das ganze (endlos wachsende) Script.log
+        # Unfertige Zeilen nur im alten Format (target.txt ohne Newline), nie bei Reporter-Zeilen
+        self.consume_lines(self._tailer_for(custom_path).read_new_lines(include_partial=not self.structured))
+
+    def consume_lines(self, lines):
+        now = time.time()
+        with self.target_lock:
+            for line in lines:
+                record = parse_target_line(line, now)
+                if record is not None:
+                    self.structured = True
+                    # Die Unix-Zeit des Plugins hat nur Sekunden-Auflösung, liegt aber nie nach dem Ereignis:
+                    # das Maximum von (Unix-Zeit - Spielzeit) nähert sich dem wahren Versatz von unten.
+                    offset = record.timestamp - record.game_time
+                    if self.clock_offset is None or offset > self.clock_offset: self.clock_offset = offset
+                    self._set_target(record.name, record)
+                elif not self.structured and line.strip():
+                    self._set_target(line.strip(), None) # altes Plugin: nur der Name
+            
+    def _set_target(self, name, record):
+        self.current_record = record
+        if name != self.current_target:
+            self.current_target = name
+            self.log_debug(f"Neuer NPC erkannt: '{self.current_target}'")
+
+    def event_time(self, record=None):
+        """Geschätzte Unix-Zeit, zu der das Plugin das Ziel gemeldet hat (None ohne strukturierte Daten)"""
+        record = record or self.current_record
+        if record is None: return None
+        if self.clock_offset is None: return record.timestamp
+        return record.game_time + self.clock_offset
+
+    def target_latency(self):
+        """Sekunden seit der Plugin-Meldung des aktuellen Ziels"""
+        t = self.event_time()
+        return None if t is None else time.time() - t
+
+    def start_watching(self, custom_path="", interval=0.2):
+        """Optional: Hintergrund-Watcher, der current_target sofort nachführt, wenn das Plugin etwas schreibt"""
+        self.watch_interval = interval
+        tailer = self._tailer_for(custom_path)
+        self.consume_lines(tailer.read_new_lines(include_partial=not self.structured))
+        tailer.start(self.consume_lines, interval)
+
+    def stop_watching(self):
+        self.watch_interval = None
+        if self.tailer is not None: self.tailer.stop()
 
     def get_voice_path(self):
         name = self.current_target
-        name_lower = name.lower()
-        expected_gender = self.npc_database.get(name_lower, "m")
+        record = self.current_record
+        entity_id = record.entity_id if record and record.name == name else None
+        if entity_id and entity_id in self.entity_voices: return self.entity_voices[entity_id]
+        path = self._resolve_voice(name)
+        if entity_id and path: self.entity_voices[entity_id] = path
+        return path
+
+    def _resolve_voice(self, name):
+        expected_gender = self.lookup_gender(name)
         
         # 1. Prüfen ob Zuweisung existiert und korrekt ist
         if name in self.assignments:
@@ -96,38 +167,17 @@ class NpcManager:
         # 2. Neue Stimme zuweisen
         return self.auto_assign_new_voice(name, expected_gender)
 
-    def auto_assign_new_voice(self, npc_name, gender):
-        if not os.path.exists(self.generated_dir): return ""
-        all_files = [os.path.join(self.generated_dir, f) for f in os.listdir(self.generated_dir) if f.endswith(".wav")]
-        if not all_files: return ""
-
-        # --- BUGFIX: startswith statt in ---
-        # "female_" enthält "male_", deshalb war die alte Logik fehlerhaft.
-        # Jetzt prüfen wir strikt den Anfang des Dateinamens.
-        males = [f for f in all_files if os.path.basename(f).lower().startswith("male_")]
-        females = [f for f in all_files if os.path.basename(f).lower().startswith("female_")]
-        
-        # Fallback: Falls Dateien manuell umbenannt wurden und kein Prefix haben -> neutral/alles
-        others = [f for f in all_files if f not in males and f not in females]
+    def voice_usage(self):
+        """Dateiname -> Anzahl zugewiesener NPCs (nur für balance_voices)"""
+        return Counter(os.path.basename(p) for p in self.assignments.values() if p)
 
-        self.log_debug(f"Pool: {len(males)} Maenner, {len(females)} Frauen.")
+    def auto_assign_new_voice(self, npc_name, gender):
+        # Deterministisch per Hash: gleicher NPC -> gleiche Stimme, auch ohne geteilte Zuweisungsdatei
+        chosen = self.voice_pool.choose(npc_name, gender, self.voice_usage() if self.balance_voices else None)
+        if chosen is None: return ""
+        if chosen.gender not in (gender, "?"):
+            self.log_debug(f"Info: Keine passende Stimme ({gender}) da, nehme {chosen.filename}.")
 
-        chosen = ""
-        
-        if gender == "f":
-            if females: chosen = random.choice(females)
-            elif males: 
-                chosen = random.choice(males)
-                self.log_debug("Info: Keine Frauenstimme da, nehme Mann.")
-            else: chosen = random.choice(all_files)
-        else: # Male
-            if males: chosen = random.choice(males)
-            elif females: 
-                chosen = random.choice(females)
-                self.log_debug("Info: Keine Männerstimme da, nehme Frau.")
-            else: chosen = random.choice(all_files)
-
-        self.assignments[npc_name] = chosen
-        self.save_assignments()
-        self.log_debug(f"Zugewiesen für '{npc_name}': {os.path.basename(chosen)}")
-        return chosen
+        self.assignments_store.set(npc_name, chosen.path) # wird gebündelt geschrieben
+        self.log_debug(f"Zugewiesen für '{npc_name}': {chosen.filename}")
+        return chosen.path
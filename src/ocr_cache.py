@@ -0,0 +1,70 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+class OcrCache:
+    """LRU-Cache vor EasyOCR. Schlüssel ist ein binarisiertes, halb so großes Abbild des vorverarbeiteten Bildes.
+    Exakte Treffer gehen über den SHA1 davon; sonst gilt ein Eintrag gleicher Größe nur dann als identisch, wenn
+    die Abweichungen vereinzeltes Capture-Rauschen sind: die XOR-Maske muss nach einem Opening (Erosion, dann
+    Dilatation mit 2x2) leer sein. Ein Anteil über das ganze Bild reicht nicht, "Tötet 3 Wölfe" vs. "Tötet 8 Wölfe"
+    oder "gewartet" vs. "gewarnt" ändern nur ein paar Pixel, die aber zusammenhängend an einer Stelle.
+    Siehe scripts/check_ocr_cache.py."""
+
+    KERNEL = np.ones((2, 2), dtype=np.uint8)
+
+    def __init__(self, max_entries=64, downscale=2, max_diff=0.01, threshold=64):
+        self.max_entries = max_entries
+        self.downscale = downscale
+        self.max_diff = max_diff # grobe Obergrenze (Anteil), darüber wird das Opening gar nicht erst gerechnet
+        self.threshold = threshold
+        self.entries = OrderedDict() # digest -> (thumb shape, packed bits, text)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, img):
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        h, w = gray.shape[:2]
+        small = cv2.resize(gray, (max(1, w // self.downscale), max(1, h // self.downscale)), interpolation=cv2.INTER_AREA)
+        packed = np.packbits(small > self.threshold)
+        return hashlib.sha1(packed.tobytes() + repr(small.shape).encode()).hexdigest(), small.shape, packed
+
+    def _same(self, shape, a, b):
+        """Nur verstreute Einzelpixel erlaubt, keine zusammenhängende Änderung (Ziffer, Satzzeichen, Buchstabe)"""
+        h, w = shape
+        diff = np.unpackbits(a ^ b)[:h * w]
+        n = int(diff.sum())
+        if n == 0: return True
+        if n > int(h * w * self.max_diff): return False
+        return not cv2.morphologyEx(diff.reshape(h, w), cv2.MORPH_OPEN, self.KERNEL).any()
+
+    def get(self, img):
+        """Liefert (fingerprint, text). text ist None bei einem Miss; fingerprint wird an put() weitergereicht."""
+        fp = self.fingerprint(img)
+        digest, shape, packed = fp
+        with self.lock:
+            entry = self.entries.get(digest)
+            if entry is None:
+                for key, (e_shape, e_packed, _) in reversed(self.entries.items()):
+                    if e_shape == shape and self._same(shape, e_packed, packed):
+                        digest, entry = key, self.entries[key]
+                        break
+            if entry is None:
+                self.misses += 1
+                return fp, None
+            self.entries.move_to_end(digest)
+            self.hits += 1
+            return fp, entry[2]
+
+    def put(self, fp, text):
+        digest, shape, packed = fp
+        with self.lock:
+            self.entries[digest] = (shape, packed, text)
+            self.entries.move_to_end(digest)
+            while len(self.entries) > self.max_entries: self.entries.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0, "entries": len(self.entries)}
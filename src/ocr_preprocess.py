@@ -0,0 +1,123 @@
+import os
+import sys
+import time
+import difflib
+from collections import namedtuple
+import numpy as np
+import cv2
+
+# Alle Zeilen untereinander auf einer Leinwand + Boxen [x_min, x_max, y_min, y_max] für reader.recognize
+LineBatch = namedtuple("LineBatch", "canvas boxes scales")
+
+THRESHOLD = 90 # wie bisher: dunkler Hintergrund -> 0, heller Text bleibt
+TARGET_HEIGHT = 48 # Zeilenhöhe, die der EasyOCR-Recognizer gut liest (er skaliert intern auf 64)
+MAX_SCALE = 3.0
+
+def to_gray(img):
+    """Genau eine Farbkonvertierung (Screenshots kommen als RGB)"""
+    return img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+
+def _runs(flags, max_gap):
+    """Zusammenhängende True-Bereiche (start, end), Lücken bis max_gap werden überbrückt"""
+    idx = np.flatnonzero(flags)
+    if idx.size == 0: return []
+    splits = np.flatnonzero(np.diff(idx) > max_gap + 1)
+    starts = np.concatenate(([idx[0]], idx[splits + 1]))
+    ends = np.concatenate((idx[splits], [idx[-1]])) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+def find_text_lines(gray, threshold=THRESHOLD, min_height=5, row_gap=1, pad=3, max_fill=0.6):
+    """Textzeilen über Projektionsprofile: Zeilen mit hellen Pixeln bilden Bänder, die Spalten-Projektion je Band
+    liefert die horizontale Ausdehnung. Fast volle Zeilen (Rahmen, Trennlinien) werden ignoriert.
+    Liefert [(x0, x1, y0, y1)] im Originalbild."""
+    mask = gray > threshold
+    h, w = mask.shape
+    mask[:, mask.sum(axis=0) >= max_fill * h] = False # senkrechte Rahmenlinien
+    row_fill = mask.sum(axis=1)
+    text_rows = (row_fill >= 2) & (row_fill < max_fill * w)
+    lines = []
+    for y0, y1 in _runs(text_rows, row_gap):
+        if y1 - y0 < min_height: continue
+        cols = _runs(mask[y0:y1].any(axis=0), max_gap=max(8, (y1 - y0)))
+        if not cols: continue
+        x0, x1 = cols[0][0], cols[-1][1]
+        lines.append((max(0, x0 - pad), min(w, x1 + pad), max(0, y0 - pad), min(h, y1 + pad)))
+    return lines
+
+def line_scale(height, target=TARGET_HEIGHT, max_scale=MAX_SCALE):
+    """Nur so weit hochskalieren, wie die Zeilenhöhe es braucht (große Schrift bleibt 1:1)"""
+    return float(min(max_scale, max(1.0, target / max(1, height))))
+
+def prepare_lines(img, threshold=THRESHOLD, target=TARGET_HEIGHT, max_scale=MAX_SCALE, spacing=8):
+    """Graustufen einmal, Zeilen finden, jede Zeile einzeln passend skalieren und schwellen, alles auf eine Leinwand.
+    None, wenn keine Zeilen gefunden wurden (dann greift der alte Weg)."""
+    gray = to_gray(img)
+    lines = find_text_lines(gray, threshold)
+    if not lines: return None
+    crops, scales = [], []
+    for x0, x1, y0, y1 in lines:
+        s = line_scale(y1 - y0, target, max_scale)
+        crop = gray[y0:y1, x0:x1]
+        if s > 1.0: crop = cv2.resize(crop, None, fx=s, fy=s, interpolation=cv2.INTER_CUBIC)
+        crops.append(cv2.threshold(crop, threshold, 255, cv2.THRESH_TOZERO)[1])
+        scales.append(s)
+    width = max(c.shape[1] for c in crops)
+    height = sum(c.shape[0] for c in crops) + spacing * (len(crops) + 1)
+    canvas = np.zeros((height, width), dtype=np.uint8)
+    boxes, y = [], spacing
+    for c in crops:
+        ch, cw = c.shape
+        canvas[y:y + ch, :cw] = c
+        boxes.append([0, cw, y, y + ch])
+        y += ch + spacing
+    return LineBatch(canvas, boxes, scales)
+
+def legacy_preprocess(img, threshold=THRESHOLD, upscale=3):
+    """Der alte Weg: alles 3x, Graustufen + THRESH_TOZERO (Graustufen vorher, damit nur ein Kanal skaliert wird)"""
+    gray = cv2.resize(to_gray(img), None, fx=upscale, fy=upscale)
+    return cv2.threshold(gray, threshold, 255, cv2.THRESH_TOZERO)[1]
+
+def recognize_lines(reader, canvas, boxes):
+    """Nur Erkennung, keine Detektion: die Zeilenboxen sind schon bekannt"""
+    texts = reader.recognize(canvas, horizontal_list=boxes, free_list=[], detail=0, paragraph=False, batch_size=len(boxes))
+    return " ".join(t.strip() for t in texts if t.strip())
+
+# --- BENCHMARK: python src/ocr_preprocess.py <ordner mit last_scan_raw.jpg-artigen Bildern> [--cpu] ---
+# Liegt neben einem Bild eine gleichnamige .txt, dient sie als Referenz, sonst das Ergebnis des alten Wegs.
+def _bench(folder, gpu=True, repeats=3):
+    import easyocr
+    paths = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith((".jpg", ".jpeg", ".png")))
+    if not paths:
+        print("Keine Bilder gefunden."); return
+    reader = easyocr.Reader(["de", "en"], gpu=gpu)
+    reader.readtext(np.zeros((32, 128), dtype=np.uint8), detail=0)
+
+    def timed(fn):
+        best, out = None, None
+        for _ in range(repeats):
+            t0 = time.perf_counter(); out = fn(); dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        return out, best * 1000
+
+    print(f"{'Bild':24} {'alt ms':>8} {'neu ms':>8} {'Zeilen':>6} {'alt Gen.':>9} {'neu Gen.':>9}")
+    tot_old = tot_new = acc_old = acc_new = 0.0
+    for p in paths:
+        img = cv2.cvtColor(cv2.imread(p), cv2.COLOR_BGR2RGB)
+        old, t_old = timed(lambda: " ".join(reader.readtext(legacy_preprocess(img), detail=0, paragraph=True)).strip())
+        def new_path():
+            batch = prepare_lines(img)
+            return (recognize_lines(reader, batch.canvas, batch.boxes) if batch else old), (len(batch.boxes) if batch else 0)
+        (new, n_lines), t_new = timed(new_path)
+        ref_path = os.path.splitext(p)[0] + ".txt"
+        ref = open(ref_path, encoding="utf-8").read().strip() if os.path.exists(ref_path) else old
+        a_old = difflib.SequenceMatcher(None, ref, old).ratio()
+        a_new = difflib.SequenceMatcher(None, ref, new).ratio()
+        tot_old += t_old; tot_new += t_new; acc_old += a_old; acc_new += a_new
+        print(f"{os.path.basename(p)[:24]:24} {t_old:8.0f} {t_new:8.0f} {n_lines:6d} {a_old:9.3f} {a_new:9.3f}")
+    n = len(paths)
+    print(f"{'Mittel':24} {tot_old / n:8.0f} {tot_new / n:8.0f} {'':6} {acc_old / n:9.3f} {acc_new / n:9.3f}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Aufruf: python src/ocr_preprocess.py <ordner> [--cpu]"); sys.exit(1)
+    _bench(sys.argv[1], gpu="--cpu" not in sys.argv)
@@ -0,0 +1,133 @@
+import time
+import atexit
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+def _worker_main(requests, results, langs, gpu):
+    """Läuft im eigenen Prozess: Reader einmal laden, dann Bilder aus dem Shared Memory lesen"""
+    try:
+        import easyocr
+        from ocr_preprocess import recognize_lines
+        reader = easyocr.Reader(langs, gpu=gpu)
+        reader.readtext(np.zeros((32, 128), dtype=np.uint8), detail=0) # Dummy-Inferenz
+    except Exception as e:
+        results.put(("error", None, f"{type(e).__name__}: {e}"))
+        return
+    results.put(("ready", None, None))
+
+    shm = None
+    while True:
+        msg = requests.get()
+        if msg is None: break
+        req_id, shm_name, shape, dtype, boxes = msg
+        try:
+            if shm is None or shm.name != shm_name:
+                if shm is not None: shm.close()
+                shm = shared_memory.SharedMemory(name=shm_name)
+            img = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            if boxes: text = recognize_lines(reader, img, boxes)
+            else: text = " ".join(reader.readtext(img, detail=0, paragraph=True)).strip()
+            del img # View freigeben, sonst lässt sich der Block nicht schließen
+            results.put((req_id, text, None))
+        except Exception as e:
+            results.put((req_id, None, f"{type(e).__name__}: {e}"))
+    if shm is not None: shm.close()
+
+class OcrWorker:
+    """EasyOCR in einem langlebigen Hintergrundprozess, damit Tk-Mainloop, Hotkeys und Audio-Consumer während
+    der Inferenz nicht um den GIL kämpfen. Bilder gehen über einen Shared-Memory-Block (nur kopieren, nicht picklen),
+    zurück kommt nur der Text über eine Queue. Gleiche Schnittstelle wie pipeline.EasyOcrBackend."""
+
+    def __init__(self, langs=("de", "en"), gpu=True, start_timeout=300.0, timeout=60.0):
+        self.langs = list(langs)
+        self.gpu = gpu
+        self.start_timeout = start_timeout # erster Start lädt ggf. Modelle herunter
+        self.timeout = timeout
+        self.ctx = mp.get_context("spawn") # fork + CUDA/Torch verträgt sich nicht
+        self.lock = threading.Lock()
+        self.proc = None
+        self.requests = None
+        self.results = None
+        self.shm = None
+        self.req_id = 0
+        atexit.register(self.close) # Prozess beenden und Shared Memory freigeben
+
+    @property
+    def ready(self):
+        return self.proc is not None and self.proc.is_alive()
+
+    def load(self):
+        with self.lock:
+            if self.ready: return self
+            self._shutdown()
+            self.requests, self.results = self.ctx.Queue(), self.ctx.Queue()
+            self.proc = self.ctx.Process(target=_worker_main, args=(self.requests, self.results, self.langs, self.gpu), daemon=True, name="LQAG-OCR")
+            self.proc.start()
+            # In kurzen Abständen warten: stirbt der Prozess vor "ready" (nativer Absturz in Torch/CUDA, Import-Fehler),
+            # sofort aufgeben statt start_timeout lang zu hängen -> _warmup fällt gleich auf OCR im Programm zurück
+            deadline = time.monotonic() + self.start_timeout
+            while True:
+                try:
+                    status, _, err = self.results.get(timeout=1.0)
+                    break
+                except Exception:
+                    if not self.proc.is_alive():
+                        code = self.proc.exitcode
+                        self._shutdown()
+                        raise RuntimeError(f"OCR-Prozess beim Start beendet (Exit-Code {code})")
+                    if time.monotonic() >= deadline:
+                        self._shutdown()
+                        raise TimeoutError("OCR-Prozess meldet sich nicht")
+            if status != "ready":
+                self._shutdown()
+                raise RuntimeError(f"OCR-Prozess konnte nicht starten: {err}")
+        return self
+
+    def _buffer_for(self, nbytes):
+        """Shared-Memory-Block wiederverwenden, nur bei größeren Bildern neu anlegen"""
+        if self.shm is None or self.shm.size < nbytes:
+            self._release_shm()
+            self.shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 4 * 1024 * 1024))
+        return self.shm
+
+    def read(self, img, boxes=None):
+        self.load()
+        img = np.ascontiguousarray(img)
+        with self.lock:
+            shm = self._buffer_for(img.nbytes)
+            np.ndarray(img.shape, dtype=img.dtype, buffer=shm.buf)[...] = img
+            self.req_id += 1
+            self.requests.put((self.req_id, shm.name, img.shape, img.dtype.str, boxes))
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try: req_id, text, err = self.results.get(timeout=min(1.0, max(0.01, deadline - time.monotonic())))
+                except Exception:
+                    if not self.proc.is_alive(): raise RuntimeError("OCR-Prozess ist abgestürzt")
+                    if time.monotonic() >= deadline: raise TimeoutError("OCR-Prozess antwortet nicht")
+                    continue
+                if req_id != self.req_id: continue # Antwort auf eine abgebrochene Anfrage
+                if err: raise RuntimeError(err)
+                return text
+
+    def _release_shm(self):
+        if self.shm is None: return
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except: pass
+        self.shm = None
+
+    def _shutdown(self):
+        if self.proc is not None:
+            try:
+                self.requests.put(None)
+                self.proc.join(2)
+                if self.proc.is_alive(): self.proc.terminate()
+            except: pass
+        self.proc = None
+        self._release_shm()
+
+    def close(self):
+        with self.lock: self._shutdown()
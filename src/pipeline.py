@@ -0,0 +1,257 @@
+import os
+import sys
+import time
+import json
+import argparse
+from collections import namedtuple
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__))) # vor den lokalen Modulen: "python src/pipeline.py" von überall
+from tracing import tracer
+from ocr_preprocess import LineBatch, prepare_lines, legacy_preprocess, recognize_lines, to_gray
+from screen_capture import create_capture, FileReplayCapture
+
+# Ergebnis eines Durchlaufs; area None = Quest-Fenster nicht gefunden, timings in ms je Stufe
+ScanResult = namedtuple("ScanResult", "text target voice_path area score timings")
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# Capture-Backends siehe screen_capture.py (mss, pyautogui, Datei-Replay)
+
+# --- OCR BACKENDS (read(img) -> Text) ---
+class EasyOcrBackend:
+    def __init__(self, langs=("de", "en"), gpu=True):
+        self.langs = list(langs)
+        self.gpu = gpu
+        self.reader = None
+
+    @property
+    def ready(self):
+        return self.reader is not None
+
+    def load(self):
+        if self.reader is None:
+            import easyocr
+            self.reader = easyocr.Reader(self.langs, gpu=self.gpu)
+            self.reader.readtext(np.zeros((32, 128), dtype=np.uint8), detail=0) # Dummy-Inferenz
+        return self
+
+    def read(self, img, boxes=None):
+        """Mit boxes (Zeilen aus ocr_preprocess) nur Erkennung, ohne die teure Text-Detektion"""
+        self.load()
+        if boxes: return recognize_lines(self.reader, img, boxes)
+        return " ".join(self.reader.readtext(img, detail=0, paragraph=True)).strip()
+
+# --- TTS BACKENDS (speak(text, voice_ref, settings, on_progress)) ---
+# Live-Wiedergabe: die AudioEngine selbst erfüllt die Schnittstelle.
+class WavFileTts:
+    """Schreibt statt abzuspielen eine WAV nach <out_dir>/<name>.wav (name setzt der Aufrufer je Bild)"""
+    def __init__(self, engine, out_dir):
+        self.engine = engine
+        self.out_dir = out_dir
+        self.name = "output"
+        self.last_path = None
+
+    def speak(self, text, voice_ref, settings, on_progress=None):
+        import soundfile as sf
+        self.last_path = None
+        result = self.engine.synthesize(text, voice_ref, settings)
+        if result is None: return
+        data, fs = result
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.last_path = os.path.join(self.out_dir, f"{self.name}.wav")
+        sf.write(self.last_path, data, fs)
+
+class Pipeline:
+    """Capture -> Fenster finden -> Vorverarbeitung -> OCR -> Stimme -> TTS, ganz ohne Tk.
+    Die App ist nur noch ein Client davon, die CLI unten verarbeitet einen Ordner mit Screenshots."""
+
+    MIN_TEXT = 4 # kürzere OCR-Ergebnisse sind Rauschen
+    CAPTURE_MODE = "gray" # Matching und OCR brauchen nur Graustufen -> nur eine Konvertierung direkt beim Grabben
+
+    def __init__(self, capture=None, ocr=None, tts=None, tracker=None, npc_manager=None, settings=None, ocr_cache=None, debug_dir=None):
+        self.capture = capture or create_capture()
+        self.ocr = ocr or EasyOcrBackend()
+        self.tts = tts # None -> nur Text
+        self.tracker = tracker # None -> das ganze Bild ist das Quest-Fenster (z.B. fertig zugeschnittene Screenshots)
+        self.npc_manager = npc_manager
+        self.settings = settings if settings is not None else {} # Dict oder Funktion, die eins liefert
+        self.ocr_cache = ocr_cache
+        self.debug_dir = debug_dir
+
+    def get_settings(self):
+        return self.settings() if callable(self.settings) else self.settings
+
+    # --- EINZELNE STUFEN ---
+    def locate(self, frame):
+        """(x, y, w, h) des Quest-Fensters und der Match-Score (frame: Graustufen oder RGB)"""
+        if self.tracker is None: return (0, 0, frame.shape[1], frame.shape[0]), 1.0
+        area = self.tracker.locate(to_gray(frame))
+        return area, min(self.tracker.last_scores)
+
+    def preprocess(self, img):
+        """Zeilenmodus: nur die Textzeilen, je nach Schrifthöhe skaliert (LineBatch).
+        Sonst bzw. ohne gefundene Zeilen der alte Weg: alles 3x, Graustufen, dunkler Hintergrund auf 0."""
+        if self.get_settings().get("ocr_line_mode", True):
+            batch = prepare_lines(img)
+            if batch is not None: return batch
+        return legacy_preprocess(img)
+
+    def recognize(self, proc):
+        img, boxes = (proc.canvas, proc.boxes) if isinstance(proc, LineBatch) else (proc, None)
+        # Gleiches Fenster nochmal gelesen -> Text aus dem Cache, OCR entfällt
+        if self.ocr_cache is None: return self.ocr.read(img, boxes)
+        with tracer.span("ocr_cache"): fp, txt = self.ocr_cache.get(img)
+        if txt is None:
+            with tracer.span("ocr_engine", h=img.shape[0], w=img.shape[1], lines=len(boxes or ())): txt = self.ocr.read(img, boxes)
+            self.ocr_cache.put(fp, txt)
+        return txt
+
+    def resolve_voice(self):
+        """(NPC-Name, Stimme) aus dem Plugin, ohne NpcManager (None, None)"""
+        if self.npc_manager is None: return None, None
+        settings = self.get_settings()
+        self.npc_manager.balance_voices = bool(settings.get("balance_voices"))
+        with tracer.span("target_update"): self.npc_manager.update(settings.get("plugin_target_path", ""))
+        with tracer.span("voice_resolve"): return self.npc_manager.current_target, self.npc_manager.get_voice_path()
+
+    def _debug_write(self, name, data):
+        if not self.debug_dir or not self.get_settings().get("debug_mode"): return
+        path = os.path.join(self.debug_dir, name)
+        if isinstance(data, str):
+            with open(path, "w", encoding="utf-8") as f: f.write(data)
+        else: cv2.imwrite(path, data)
+
+    # --- GANZE KETTE ---
+    def run(self, **kwargs):
+        t0 = time.perf_counter()
+        frame = self.capture.grab(mode=self.CAPTURE_MODE)
+        capture_ms = (time.perf_counter() - t0) * 1000
+        tracer.record("screenshot", t0, capture_ms / 1000)
+        res = self.process(frame, **kwargs)
+        res.timings["capture"] = capture_ms
+        return res
+
+    def process(self, frame, voice=None, speak=True, on_text=None, on_progress=None, located=False):
+        """Ein Screenshot (Graustufen oder RGB) bis zur Sprachausgabe. voice=(name, pfad) überspringt die Plugin-Abfrage,
+        on_text(name, text) wird vor der Synthese aufgerufen, located=True: frame ist schon der Dialog."""
+        timings = {}
+        def stage(name, t0):
+            dt = time.perf_counter() - t0
+            timings[name] = dt * 1000
+            tracer.record(name, t0, dt)
+
+        t = time.perf_counter()
+        if voice is None:
+            voice = self.resolve_voice()
+            stage("voice", t)
+        target, voice_path = voice
+
+        t = time.perf_counter()
+        if located: area, score = (0, 0, frame.shape[1], frame.shape[0]), 1.0
+        else:
+            area, score = self.locate(frame)
+            stage("locate", t)
+        if not area: return ScanResult(None, target, voice_path, None, score, timings)
+
+        t = time.perf_counter()
+        x, y, w, h = area
+        img = frame[y:y + h, x:x + w]
+        proc = self.preprocess(img)
+        stage("preprocess", t)
+        self._debug_write("last_scan_raw.jpg", img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
+        self._debug_write("last_scan_processed.jpg", proc.canvas if isinstance(proc, LineBatch) else proc)
+
+        t = time.perf_counter()
+        txt = self.recognize(proc)
+        if isinstance(proc, LineBatch) and len(txt) < self.MIN_TEXT:
+            txt = self.recognize(legacy_preprocess(img)) # Zeilensuche lag daneben -> volle Detektion
+        stage("ocr", t)
+        self._debug_write("last_recognized_text.txt", txt)
+
+        if len(txt) >= self.MIN_TEXT:
+            if on_text: on_text(target, txt)
+            if speak and self.tts is not None:
+                t = time.perf_counter()
+                self.tts.speak(txt, voice_path, self.get_settings(), on_progress=on_progress)
+                stage("tts", t) # Live-Wiedergabe: nur der Start, Batch: komplette Synthese
+        return ScanResult(txt, target, voice_path, area, score, timings)
+
+# --- CLI: python src/pipeline.py <ordner> [-o ausgabe] ---
+def main(argv=None):
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cache_dir = os.path.join(root_dir, "resources", "cache")
+    ap = argparse.ArgumentParser(description="Screenshots -> Text (+ WAV), ohne GUI")
+    ap.add_argument("images", help="Ordner mit Screenshots oder eine einzelne Bilddatei")
+    ap.add_argument("-o", "--out", default=os.path.join(root_dir, "debug", "batch"))
+    ap.add_argument("--templates", default=cache_dir, help="Ordner mit last_tl.png/last_br.png")
+    ap.add_argument("--cropped", action="store_true", help="Bilder sind schon das Quest-Fenster (kein Template-Matching)")
+    ap.add_argument("--voice", help="Stimme (WAV oder ElevenLabs-ID)")
+    ap.add_argument("--npc", help="NPC-Name, Stimme wie im Spiel zuordnen")
+    ap.add_argument("--no-audio", action="store_true")
+    ap.add_argument("--local", action="store_true", help="XTTS statt ElevenLabs")
+    ap.add_argument("--cpu", action="store_true", help="OCR ohne GPU")
+    args = ap.parse_args(argv)
+
+    if os.path.isdir(args.images):
+        paths = sorted(os.path.join(args.images, f) for f in os.listdir(args.images) if f.lower().endswith(IMAGE_EXTS))
+    else: paths = [args.images]
+    if not paths:
+        print("Keine Bilder gefunden."); return 1
+    templates = [os.path.join(args.templates, "last_tl.png"), os.path.join(args.templates, "last_br.png")]
+    if not args.cropped and not all(os.path.isfile(p) for p in templates):
+        print("Templates fehlen, --templates angeben oder --cropped nutzen"); return 1
+
+    from settings_manager import SettingsManager
+    from ocr_cache import OcrCache
+    settings = dict(SettingsManager(root_dir).get_all())
+    settings["debug_mode"] = False
+    if args.local: settings["use_elevenlabs"] = False
+
+    tracker = None
+    if not args.cropped:
+        from window_tracker import WindowTracker
+        tracker = WindowTracker.from_files(*templates, min_score=float(settings.get("match_threshold", 0.7)))
+
+    voice = (None, args.voice)
+    if args.npc and not args.voice:
+        from npc_manager import NpcManager
+        npc = NpcManager()
+        npc.current_target = args.npc
+        voice = (args.npc, npc.get_voice_path())
+
+    tts = None
+    if not args.no_audio:
+        from audio_engine import AudioEngine
+        tts = WavFileTts(AudioEngine(), args.out)
+
+    t0 = time.perf_counter()
+    ocr = EasyOcrBackend(gpu=not args.cpu).load()
+    print(f"OCR geladen in {(time.perf_counter() - t0):.1f} s")
+    pipe = Pipeline(capture=FileReplayCapture(paths, cache=False), ocr=ocr, tts=tts, tracker=tracker, settings=settings, ocr_cache=OcrCache())
+
+    os.makedirs(args.out, exist_ok=True)
+    all_timings = []
+    with open(os.path.join(args.out, "timings.jsonl"), "w", encoding="utf-8") as log:
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            if tts: tts.name = name
+            res = pipe.run(voice=voice)
+            if res.area is None:
+                print(f"{name}: Quest-Fenster nicht gefunden (Score {res.score:.2f})")
+            else:
+                with open(os.path.join(args.out, f"{name}.txt"), "w", encoding="utf-8") as f: f.write(res.text)
+                print(f"{name}: {len(res.text)} Zeichen " + " ".join(f"{k}={v:.0f}ms" for k, v in res.timings.items()))
+            log.write(json.dumps({"image": name, "found": res.area is not None, "score": round(res.score, 3), "chars": len(res.text or ""), "timings_ms": {k: round(v, 1) for k, v in res.timings.items()}}) + "\n")
+            all_timings.append(res.timings)
+
+    stages = sorted({k for t in all_timings for k in t})
+    print(f"\n{'Stufe':12} {'Median':>9} {'Max':>9}")
+    for s in stages:
+        vals = [t[s] for t in all_timings if s in t]
+        print(f"{s:12} {np.median(vals):8.1f}ms {max(vals):8.1f}ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import cv2
+
+# grab(region=None, mode="rgb") -> np.ndarray
+#   region: (x, y, w, h) in Bildschirmkoordinaten, None = ganzer (Haupt-)Bildschirm
+#   mode:   "rgb", "bgr" oder "gray"
+# Schnelle Backends geben wiederverwendete Puffer zurück: wer ein Bild über den nächsten grab() hinaus braucht, kopiert.
+
+_FROM_RGB = {"rgb": None, "bgr": cv2.COLOR_RGB2BGR, "gray": cv2.COLOR_RGB2GRAY}
+_FROM_BGRA = {"rgb": cv2.COLOR_BGRA2RGB, "bgr": cv2.COLOR_BGRA2BGR, "gray": cv2.COLOR_BGRA2GRAY}
+
+def convert_rgb(img, mode):
+    code = _FROM_RGB[mode]
+    return img if code is None else cv2.cvtColor(img, code)
+
+def _crop(img, region):
+    if region is None: return img
+    x, y, w, h = region
+    return img[y:y + h, x:x + w]
+
+class MssCapture:
+    """mss (BitBlt unter Windows, XShm unter Linux): liefert BGRA-Bytes, die ohne Kopie als Array gelesen und mit
+    einer einzigen cvtColor in einen wiederverwendeten Zielpuffer umgewandelt werden. Regionen werden direkt
+    beim Grabben ausgeschnitten. Alle Grabs laufen auf einem langlebigen Capture-Thread: eine einzige mss-Instanz
+    (unter Windows nicht threadübergreifend nutzbar, jede neue hält GDI-Handles) und ein Puffer je Modus und Größe,
+    auch wenn jeder Scan aus einem neuen Thread kommt."""
+
+    name = "mss"
+
+    def __init__(self, monitor=1):
+        import mss
+        self.monitor_index = monitor # 1 = Hauptbildschirm (wie pyautogui), 0 = alle zusammen
+        self.buffers = {} # (mode, h, w) -> Zielpuffer
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="LQAG-Capture")
+        self.sct = self.worker.submit(mss.mss).result() # auf dem Capture-Thread anlegen
+
+    def grab(self, region=None, mode="rgb"):
+        return self.worker.submit(self._grab, region, mode).result()
+
+    def _grab(self, region, mode):
+        sct = self.sct
+        mon = sct.monitors[self.monitor_index] if self.monitor_index < len(sct.monitors) else sct.monitors[0]
+        if region is not None:
+            x, y, w, h = region
+            mon = {"left": mon["left"] + x, "top": mon["top"] + y, "width": w, "height": h}
+        shot = sct.grab(mon)
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        key = (mode, shot.height, shot.width)
+        dst = self.buffers.get(key)
+        out = cv2.cvtColor(bgra, _FROM_BGRA[mode], dst=dst)
+        if dst is None:
+            if len(self.buffers) > 16: self.buffers.clear() # ständig wechselnde Regionen
+            self.buffers[key] = out
+        return out
+
+    def close(self):
+        try: self.worker.submit(self.sct.close).result()
+        except: pass
+        self.worker.shutdown(wait=False)
+
+class PyAutoGuiCapture:
+    """Bisheriger Weg über PIL (Fallback, wenn mss fehlt)"""
+
+    name = "pyautogui"
+
+    def grab(self, region=None, mode="rgb"):
+        import pyautogui
+        img = np.asarray(pyautogui.screenshot(region=region))
+        return convert_rgb(img, mode)
+
+def load_image(path):
+    """Bild von der Platte als RGB (wie ein Screenshot)"""
+    img = cv2.imread(path)
+    if img is None: raise ValueError(f"Bild nicht lesbar: {path}")
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+class FileReplayCapture:
+    """Spielt Screenshots aus Dateien ab (reihum), für Tests, Batch und Profiling ohne Spiel"""
+
+    name = "file"
+
+    def __init__(self, paths, cache=True):
+        self.paths = list(paths)
+        self.index = 0
+        self.cache = {} if cache else None
+
+    def grab(self, region=None, mode="rgb"):
+        path = self.paths[self.index % len(self.paths)]
+        self.index += 1
+        if self.cache is None: img = load_image(path)
+        else:
+            img = self.cache.get(path)
+            if img is None: img = self.cache[path] = load_image(path)
+        return convert_rgb(_crop(img, region), mode)
+
+def create_capture(prefer="mss"):
+    """Schnellstes verfügbares Backend (mss ist optional)"""
+    if prefer == "mss":
+        try: return MssCapture()
+        except Exception: pass
+    return PyAutoGuiCapture()
+
+# --- BENCHMARK: python src/screen_capture.py [-n 30] [--region x,y,w,h]  (unter Linux z.B. mit xvfb-run) ---
+def _bench(n, region):
+    backends = [PyAutoGuiCapture()]
+    try: backends.append(MssCapture())
+    except Exception as e: print(f"mss nicht verfügbar: {e}")
+
+    def legacy(region):
+        # Wie früher: PIL -> np.array (Kopie) -> cvtColor (Kopie)
+        import pyautogui
+        return cv2.cvtColor(np.array(pyautogui.screenshot(region=region)), cv2.COLOR_RGB2BGR)
+
+    cases = [("pyautogui alt (bgr)", lambda r: legacy(r))]
+    for b in backends:
+        for mode in ("rgb", "bgr", "gray"):
+            cases.append((f"{b.name} {mode}", lambda r, b=b, mode=mode: b.grab(r, mode)))
+
+    print(f"{'Backend':22} {'voll ms':>9} {'Region ms':>10}")
+    for name, fn in cases:
+        res = []
+        for r in (None, region):
+            try:
+                fn(r) # Aufwärmen (Puffer anlegen)
+                times = []
+                for _ in range(n):
+                    t0 = time.perf_counter(); fn(r); times.append((time.perf_counter() - t0) * 1000)
+                res.append(f"{np.median(times):.1f}")
+            except Exception as e: res.append(f"Fehler: {type(e).__name__}")
+        print(f"{name:22} {res[0]:>9} {res[1]:>10}")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    n = int(args[args.index("-n") + 1]) if "-n" in args else 30
+    region = tuple(int(v) for v in args[args.index("--region") + 1].split(",")) if "--region" in args else (100, 100, 640, 360)
+    _bench(n, region)
@@ -1,5 +1,4 @@
 import tkinter as tk
-import pyautogui
 
 class SnippingTool:
     def __init__(self, root, callback):
@@ -1,5 +1,5 @@
-import json
 import os
+from json_store import JsonStore
 
 class SettingsManager:
     def __init__(self, base_dir):
@@ -12,35 +12,43 @@ class SettingsManager:
             "debug_mode": True,
             "use_elevenlabs": False,
             "elevenlabs_api_keys": [], # NEU: Liste statt String
-            "plugin_target_path": ""
+            "plugin_target_path": "",
+            "audio_cache_mb": 512,
+            "tts_lookahead": 3, # Sätze, die parallel vorab synthetisiert werden
+            "match_threshold": 0.7, # Mindest-Score (TM_CCOEFF_NORMED) für die gelernten Fensterecken
+            "watch_target": True, # Plugin-Log im Hintergrund verfolgen statt erst beim Hotkey
+            "balance_voices": False, # neue NPCs bevorzugt auf wenig genutzte Stimmen verteilen
+            "library_workers": 4, # parallele Downloads beim Bibliothek-Aufbau
+            "library_rate_per_sec": 2.0, # höchstens so viele Request-Starts pro Sekunde
+            "trace_file": "trace.jsonl", # Stufen-Timings im Debug-Modus, "trace.json" = Chrome-Trace-Format
+            "ocr_out_of_process": True, # EasyOCR im eigenen Prozess (UI und Audio ruckeln nicht während der Erkennung)
+            "ocr_line_mode": True, # nur gefundene Textzeilen erkennen statt das ganze Fenster 3x vergrößert
+            "capture_backend": "mss", # "mss" (schnell, optional) oder "pyautogui"
+            "auto_read": False, # Quest-Fenster beobachten und neuen Text ohne Hotkey vorlesen
+            "auto_read_fps": 2.0, # Prüfungen pro Sekunde, solange ein Dialog offen ist
+            "auto_read_cpu_budget": 0.05 # höchstens dieser Anteil eines CPU-Kerns für das Beobachten
         }
-        self.settings = self.load_settings()
+        # Im Speicher gehalten, Schreiben gebündelt + atomar, Neuladen nur bei geänderter mtime
+        self.store = JsonStore(self.filepath, default={}, indent=4, ensure_ascii=True, on_load=self.load_settings)
 
-    def load_settings(self):
-        if not os.path.exists(self.filepath):
-            return self.defaults.copy()
-        try:
-            with open(self.filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                
-                # MIGRATION: Alten Single-Key in neue Liste umwandeln
-                if "elevenlabs_api_key" in data and isinstance(data["elevenlabs_api_key"], str):
-                    if data["elevenlabs_api_key"].strip():
-                        data["elevenlabs_api_keys"] = [data["elevenlabs_api_key"]]
-                    del data["elevenlabs_api_key"] # Alten Key löschen
-                
-                # Fehlende Defaults ergänzen
-                for k, v in self.defaults.items():
-                    if k not in data: data[k] = v
-                return data
-        except: return self.defaults.copy()
+    @property
+    def settings(self):
+        return self.store.get()
+
+    def load_settings(self, data):
+        # MIGRATION: Alten Single-Key in neue Liste umwandeln
+        if "elevenlabs_api_key" in data and isinstance(data["elevenlabs_api_key"], str):
+            if data["elevenlabs_api_key"].strip():
+                data["elevenlabs_api_keys"] = [data["elevenlabs_api_key"]]
+            del data["elevenlabs_api_key"] # Alten Key löschen
+        
+        # Fehlende Defaults ergänzen
+        for k, v in self.defaults.items():
+            if k not in data: data[k] = v
+        return data
 
     def save_settings(self):
-        try:
-            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
-            with open(self.filepath, "w", encoding="utf-8") as f:
-                json.dump(self.settings, f, indent=4)
-        except: pass
+        self.store.flush()
 
     def get(self, key):
         return self.settings.get(key, self.defaults.get(key))
@@ -49,5 +57,4 @@ class SettingsManager:
         return self.settings
 
     def set(self, key, value):
-        self.settings[key] = value
-        self.save_settings()
+        self.store.set(key, value)
@@ -0,0 +1,68 @@
+import os
+import hashlib
+import threading
+
+class SpeakerLatentCache:
+    """XTTS Conditioning-Latents + Speaker-Embedding pro Referenz-WAV.
+    Einmal berechnet, im Speicher gehalten und als .pt neben voice_map.json abgelegt (invalidiert über SHA1 der WAV)."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.memory = {} # pfad -> (size, mtime_ns, sha1, gpt_cond_latent, speaker_embedding)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def file_hash(path):
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""): h.update(block)
+        return h.hexdigest()
+
+    def _disk_path(self, speaker_wav, digest):
+        name = os.path.splitext(os.path.basename(speaker_wav))[0]
+        return os.path.join(self.cache_dir, f"{name}.{digest[:16]}.pt")
+
+    def get(self, model, speaker_wav):
+        """Liefert (gpt_cond_latent, speaker_embedding) für das XTTS-Modell."""
+        import torch
+        st = os.stat(speaker_wav)
+        with self.lock:
+            entry = self.memory.get(speaker_wav)
+            # Schneller Pfad: Datei unverändert -> kein erneutes Hashen
+            if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                return entry[3], entry[4]
+
+            digest = self.file_hash(speaker_wav)
+            if entry and entry[2] == digest:
+                self.memory[speaker_wav] = (st.st_size, st.st_mtime_ns, digest, entry[3], entry[4])
+                return entry[3], entry[4]
+
+            path = self._disk_path(speaker_wav, digest)
+            latents = None
+            if os.path.exists(path):
+                try:
+                    saved = torch.load(path, map_location=model.device)
+                    latents = (saved["gpt_cond_latent"], saved["speaker_embedding"])
+                except: latents = None
+
+            if latents is None:
+                latents = model.get_conditioning_latents(audio_path=[speaker_wav])
+                self._save(speaker_wav, path, latents)
+
+            self.memory[speaker_wav] = (st.st_size, st.st_mtime_ns, digest, latents[0], latents[1])
+            return latents
+
+    def _save(self, speaker_wav, path, latents):
+        import torch
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Veraltete Latents derselben Stimme entfernen
+            prefix = os.path.splitext(os.path.basename(speaker_wav))[0] + "."
+            for f in os.listdir(self.cache_dir):
+                if f.startswith(prefix) and f.endswith(".pt") and f.count(".") == prefix.count(".") + 1:
+                    try: os.remove(os.path.join(self.cache_dir, f))
+                    except: pass
+            tmp = path + ".tmp"
+            torch.save({"gpt_cond_latent": latents[0].cpu(), "speaker_embedding": latents[1].cpu()}, tmp)
+            os.replace(tmp, path)
+        except: pass
@@ -0,0 +1,162 @@
+import os
+import re
+import time
+import unicodedata
+
+# Wörter, vor denen ein "- " ein echter Ergänzungsstrich ist ("Nord- und Südtor") und keine Silbentrennung
+_KEEP_HYPHEN_BEFORE = {"und", "oder", "bis", "sowie", "als", "wie", "noch", "and", "or", "et", "ou"}
+_UMLAUT_FIX = {"¨a": "ä", "¨o": "ö", "¨u": "ü", "¨A": "Ä", "¨O": "Ö", "¨U": "Ü", "a¨": "ä", "o¨": "ö", "u¨": "ü", "A¨": "Ä", "O¨": "Ö", "U¨": "Ü"}
+# Satzende, ein schließendes Anführungszeichen bleibt beim Satz (Lookbehind statt mitgeschluckt)
+_SENTENCE_RE = re.compile(r"(?:(?<=[.!?…])|(?<=[.!?…][\"'»«”]))\s+")
+_CLAUSE_RE = re.compile(r"(?<=[,;:–—])\s+|\s+(?=[–—]\s)")
+
+def clean_ocr_text(text):
+    """Typische EasyOCR-Artefakte glätten: Silbentrennung am Zeilenende, | statt I, zerlegte Umlaute, Leerzeichen vor Satzzeichen."""
+    t = unicodedata.normalize("NFC", text)
+    for bad, good in _UMLAUT_FIX.items(): t = t.replace(bad, good)
+    t = re.sub(r"-\s*\n\s*", "-\n", t)
+    t = t.replace("\n", " ")
+
+    def join_hyphen(m):
+        if m.group(2).lower() in _KEEP_HYPHEN_BEFORE: return m.group(0)
+        return m.group(1) + m.group(2)
+    t = re.sub(r"([A-Za-zÄÖÜäöüß]{2,})-\s+([a-zäöüß]\w*)", join_hyphen, t)
+
+    t = re.sub(r"(?<![\w|])\|(?=[a-zäöü])", "I", t) # "|ch" -> "Ich"
+    t = t.replace("|", " ")
+    t = re.sub(r"[_~¬•]+", " ", t)
+    t = re.sub(r"\s+([,.;:!?…])", r"\1", t)
+    return " ".join(t.split())
+
+def _split_long(sentence, max_chars, target):
+    """Zu lange Sätze an Kommas/Gedankenstrichen, notfalls an Leerzeichen, in Stücke um <target> Zeichen teilen."""
+    parts = [p for p in _CLAUSE_RE.split(sentence) if p.strip()]
+    out, cur = [], ""
+    for p in parts:
+        cand = f"{cur} {p}".strip()
+        if cur and len(cand) > target:
+            out.append(cur)
+            cur = p
+        else:
+            cur = cand
+    if cur: out.append(cur)
+
+    result = []
+    for piece in out:
+        while len(piece) > max_chars:
+            cut = piece.rfind(" ", 0, target)
+            if cut <= 0: cut = piece.find(" ", target)
+            if cut <= 0: break
+            result.append(piece[:cut].strip())
+            piece = piece[cut:].strip()
+        if piece: result.append(piece)
+    return result
+
+def iter_segments(text, target=160, min_chars=40, max_chars=240, first_max=80):
+    """Liefert TTS-Häppchen der Reihe nach (Generator): kurze Sätze werden bis <target> zusammengelegt,
+    lange an Nebensätzen geteilt. Der erste Satz geht allein raus (über <first_max> Zeichen geteilt), damit die
+    erste Synthese kurz ist und die Ausgabe sofort starten kann. Ein kurzer Rest ("Ok.") wird angehängt."""
+    held, pending = None, ""
+    emitted = 0
+    first = True
+
+    def emit(chunk):
+        # Immer ein Stück zurückhalten, damit ein kurzer Rest noch an das vorige angehängt werden kann
+        nonlocal held, emitted
+        out = [held] if held is not None else []
+        emitted += len(out)
+        held = chunk
+        return out
+
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        sentence = sentence.strip()
+        if len(sentence) <= 1: continue
+        if first:
+            first = False
+            pieces = _split_long(sentence, first_max, first_max) if len(sentence) > first_max else [sentence]
+            yield from emit(pieces.pop(0))
+        else:
+            pieces = _split_long(sentence, max_chars, target) if len(sentence) > max_chars else [sentence]
+        for piece in pieces:
+            if pending and len(pending) + 1 + len(piece) > target:
+                yield from emit(pending)
+                pending = piece
+            else:
+                pending = f"{pending} {piece}".strip()
+            if len(pending) >= target:
+                yield from emit(pending)
+                pending = ""
+    if pending:
+        limit = first_max if emitted == 0 else max_chars # das erste Stück bleibt kurz
+        if held is not None and len(pending) < min_chars and len(held) + 1 + len(pending) <= limit:
+            held = f"{held} {pending}"
+        else:
+            yield from emit(pending)
+    if held is not None: yield held
+
+def segment(text, **kwargs):
+    return list(iter_segments(clean_ocr_text(text), **kwargs))
+
+# --- BENCHMARK: python src/text_segmenter.py [korpus.txt ...] ---
+SAMPLE_CORPUS = [
+    "Seid gegrüßt, Reisender! Ja. Die Straße nach Bree ist nicht mehr sicher, seit die Räuber aus dem Chet-Wald "
+    "jede Nacht die Höfe an der Ostseite überfallen, das Vieh forttreiben und die Bauern in Angst und Schrecken "
+    "versetzen, sodass keiner mehr wagt, nach Einbruch der Dunkelheit vor die Tür zu gehen. Helft uns. Bitte.",
+    "|ch habe gehört, dass Ihr mit dem Hauptmann gesprochen habt. Gut. Er ist ein ehrlicher Mann, auch wenn er "
+    "manchmal etwas zu vorsichtig ist. Bringt ihm diese Nach- richt, und sagt ihm, dass die Späher aus dem Nor- "
+    "den zurückgekehrt sind.",
+    "Nein. Nein! Das kann nicht sein. Geht. Sofort. Wir haben keine Zeit zu verlieren, denn die Schatten wachsen, "
+    "und Nord- und Südtor müssen vor Sonnenuntergang verschlossen sein.",
+]
+
+def _legacy_split(text):
+    t = text.replace("\n", " ")
+    return [s.strip() for s in re.split(r'(?<=[.!?])\s+', t) if len(s.strip()) > 1]
+
+def _bench(corpus, voice, settings):
+    """Echte AudioEngine.synthesize-Aufrufe je Häppchen, jeder Splitter mit eigenem leeren Cache.
+    Erstes Audio = bis das erste Häppchen fertig ist (danach läuft die Wiedergabe, der Rest entsteht parallel)."""
+    import shutil
+    import tempfile
+    from audio_engine import AudioEngine
+    from audio_cache import AudioCache
+    engine = AudioEngine()
+    if not settings.get("use_elevenlabs"): engine.warmup()
+    rows = {}
+    for name, split in (("alt (_split)", _legacy_split), ("neu (Segmenter)", segment)):
+        cache_dir = tempfile.mkdtemp(prefix="lqag-bench-")
+        engine.cache = AudioCache(cache_dir)
+        try:
+            r = rows[name] = [0.0, 0.0, 0, 0]
+            for text in corpus:
+                chunks = split(text)
+                for i, c in enumerate(chunks):
+                    t0 = time.perf_counter()
+                    engine.synthesize(c, voice, settings, chunks=[c])
+                    dt = time.perf_counter() - t0
+                    if i == 0: r[0] += dt
+                    r[1] += dt
+                r[2] = max(r[2], max((len(c) for c in chunks), default=0)); r[3] += len(chunks)
+        finally: shutil.rmtree(cache_dir, ignore_errors=True)
+    engine_name = "ElevenLabs" if settings.get("use_elevenlabs") else "XTTS"
+    print(f"{len(corpus)} Texte, {engine_name}, Stimme {voice}")
+    print(f"{'':18} {'Ø erstes Audio':>15} {'Σ Synthese':>11} {'längstes':>9} {'Aufrufe':>8}")
+    for name, (ttfa, total, longest, n) in rows.items():
+        print(f"{name:18} {ttfa / len(corpus):14.2f}s {total:10.2f}s {longest:9d} {n:8d}")
+
+if __name__ == "__main__":
+    import argparse
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ap = argparse.ArgumentParser(description="Segmenter gegen den alten Satz-Split mit echter Synthese messen")
+    ap.add_argument("corpus", nargs="*", help="Textdateien, Texte durch Leerzeilen getrennt (sonst Beispieltexte)")
+    ap.add_argument("--voice", required=True, help="Stimme (WAV oder ElevenLabs-ID)")
+    ap.add_argument("--elevenlabs", action="store_true", help="ElevenLabs (Keys aus settings.json) statt XTTS")
+    args = ap.parse_args()
+    from settings_manager import SettingsManager
+    settings = dict(SettingsManager(root_dir).get_all())
+    settings["use_elevenlabs"] = args.elevenlabs
+    corpus = []
+    for path in args.corpus:
+        with open(path, "r", encoding="utf-8") as f:
+            corpus += [block for block in f.read().split("\n\n") if block.strip()]
+    _bench(corpus or SAMPLE_CORPUS, args.voice, settings)
@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "t0")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.t0 = 0.0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.t0, time.perf_counter() - self.t0, self.args)
+        return False
+
+class Tracer:
+    """Zeitspannen je Stufe (Fenster verstecken, Screenshot, Matching, OCR, Synthese, Wiedergabe ...).
+    Jede Spanne landet in einem rollenden Fenster für Perzentile und, wenn ein Pfad gesetzt ist, als Zeile in einer
+    Trace-Datei: *.json im Chrome-Trace-Format (chrome://tracing, Perfetto), sonst JSONL.
+    Ein Trace beginnt mit begin() beim Hotkey, first_audio() schließt ihn mit der Ende-zu-Ende-Latenz ab."""
+
+    def __init__(self, path=None, window=200):
+        self.window = window
+        self.lock = threading.Lock()
+        self.stats = {} # name -> deque der letzten Dauern in ms
+        self.file = None
+        self.chrome = False
+        self.epoch = time.perf_counter()
+        self.trace_id = 0
+        self.trace_t0 = None
+        self.pid = os.getpid()
+        if path: self.configure(path)
+
+    def configure(self, path=None):
+        """Datei-Ausgabe an (neuer Pfad) oder aus (None). Die Statistik läuft immer."""
+        with self.lock:
+            if self.file is not None:
+                try: self.file.close()
+                except: pass
+                self.file = None
+            if not path: return
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.chrome = path.endswith(".json")
+            self.file = open(path, "w", encoding="utf-8", buffering=1)
+            # Chrome akzeptiert ein JSON-Array ohne schließende Klammer -> Zeile für Zeile schreibbar
+            if self.chrome: self.file.write("[\n")
+
+    def span(self, name, **args):
+        return _Span(self, name, args)
+
+    def begin(self, name="scan"):
+        """Neuer Trace (z.B. Hotkey gedrückt), alle folgenden Spannen gehören dazu"""
+        with self.lock:
+            self.trace_id += 1
+            self.trace_t0 = time.perf_counter()
+            if self.file is not None and self.chrome:
+                ev = {"name": name, "ph": "i", "s": "g", "ts": round((self.trace_t0 - self.epoch) * 1e6), "pid": self.pid, "tid": threading.get_ident(), "args": {"trace": self.trace_id}}
+                try: self.file.write(json.dumps(ev) + ",\n")
+                except: pass
+        return self.trace_id
+
+    def first_audio(self, t=None):
+        """Erstes hörbares Sample -> Ende-zu-Ende-Spanne ab begin()"""
+        t0 = self.trace_t0
+        if t0 is None: return None
+        self.trace_t0 = None
+        t = t if t is not None else time.perf_counter()
+        self.record("end_to_end", t0, t - t0)
+        return t - t0
+
+    def record(self, name, start, duration, args=None):
+        ms = duration * 1000
+        with self.lock:
+            d = self.stats.get(name)
+            if d is None: d = self.stats[name] = deque(maxlen=self.window)
+            d.append(ms)
+            if self.file is None: return
+            tid = threading.get_ident()
+            if self.chrome:
+                ev = {"name": name, "ph": "X", "ts": round((start - self.epoch) * 1e6), "dur": round(duration * 1e6), "pid": self.pid, "tid": tid,
+                      "args": dict(args or {}, trace=self.trace_id)}
+                line = json.dumps(ev, ensure_ascii=False) + ",\n"
+            else:
+                ev = {"trace": self.trace_id, "name": name, "start_ms": round((start - self.epoch) * 1000, 3), "dur_ms": round(ms, 3), "thread": tid}
+                if args: ev["args"] = args
+                line = json.dumps(ev, ensure_ascii=False) + "\n"
+            try: self.file.write(line)
+            except: pass
+
+    @staticmethod
+    def _pct(values, p):
+        if not values: return 0.0
+        s = sorted(values)
+        return s[min(len(s) - 1, int(round(p / 100 * (len(s) - 1))))]
+
+    def summary(self):
+        """name -> {n, p50, p90, p99, max} über das rollende Fenster (ms)"""
+        with self.lock:
+            snap = {k: list(v) for k, v in self.stats.items()}
+        return {k: {"n": len(v), "p50": self._pct(v, 50), "p90": self._pct(v, 90), "p99": self._pct(v, 99), "max": max(v)}
+                for k, v in snap.items() if v}
+
+    def format_summary(self):
+        rows = self.summary()
+        if not rows: return "Noch keine Messungen."
+        lines = [f"{'Stufe':18} {'n':>4} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}"]
+        for name, r in sorted(rows.items(), key=lambda kv: -kv[1]["p50"]):
+            lines.append(f"{name:18} {r['n']:4d} {r['p50']:8.1f} {r['p90']:8.1f} {r['p99']:8.1f} {r['max']:8.1f}")
+        return "\n".join(lines)
+
+# Ein Tracer für den ganzen Prozess; ohne configure() nur Statistik im Speicher
+tracer = Tracer()
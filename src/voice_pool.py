@@ -0,0 +1,70 @@
+import os
+import hashlib
+from collections import namedtuple
+from json_store import JsonStore
+
+VoiceInfo = namedtuple("VoiceInfo", "path filename gender voice_id")
+
+class VoicePool:
+    """Index der generierten Stimmen, getrennt nach male_/female_/sonstigen, inkl. ElevenLabs-ID aus voice_map.json.
+    Wird nur neu aufgebaut, wenn sich der Ordner oder die voice_map ändert.
+    Die Auswahl ist deterministisch (Rendezvous-Hashing über NPC-Name + Dateiname): gleicher NPC -> gleiche Stimme
+    auf jedem Rechner, und neue Stimmen verschieben nur die NPCs, die sie "gewinnen"."""
+
+    def __init__(self, generated_dir, voice_map_path=None):
+        self.generated_dir = generated_dir
+        self.voice_map = JsonStore(voice_map_path, default={}) if voice_map_path else None
+        self.signature = None
+        self.voices = []
+        self.by_gender = {"m": [], "f": [], "?": []}
+        self.by_filename = {}
+
+    @staticmethod
+    def gender_of(filename, meta=None):
+        if isinstance(meta, dict) and meta.get("gender") in ("male", "female"):
+            return "m" if meta["gender"] == "male" else "f"
+        # "female_" enthält "male_" -> strikt den Anfang prüfen
+        name = filename.lower()
+        if name.startswith("male_"): return "m"
+        if name.startswith("female_"): return "f"
+        return "?"
+
+    def refresh(self):
+        try: dir_mtime = os.stat(self.generated_dir).st_mtime_ns
+        except OSError: dir_mtime = None
+        voice_map = self.voice_map.get() if self.voice_map else {}
+        signature = (dir_mtime, self.voice_map.mtime if self.voice_map else None)
+        if signature == self.signature: return False
+        self.signature = signature
+
+        files = sorted(f for f in os.listdir(self.generated_dir) if f.endswith(".wav")) if dir_mtime is not None else []
+        self.voices = []
+        self.by_gender = {"m": [], "f": [], "?": []}
+        for f in files:
+            meta = voice_map.get(f)
+            voice_id = meta.get("voice_id") if isinstance(meta, dict) else meta
+            info = VoiceInfo(os.path.join(self.generated_dir, f), f, self.gender_of(f, meta), voice_id)
+            self.voices.append(info)
+            self.by_gender[info.gender].append(info)
+        self.by_filename = {v.filename: v for v in self.voices}
+        return True
+
+    def candidates(self, gender):
+        """Passendes Geschlecht, sonst das andere, sonst alles (wie bisher)"""
+        self.refresh()
+        other = "m" if gender == "f" else "f"
+        return self.by_gender.get(gender) or self.by_gender[other] or self.voices
+
+    @staticmethod
+    def _weight(npc_name, filename):
+        key = f"{npc_name.strip().casefold()}|{filename}".encode("utf-8")
+        return int.from_bytes(hashlib.sha1(key).digest()[:8], "big")
+
+    def choose(self, npc_name, gender, usage=None):
+        """Liefert VoiceInfo oder None. Mit usage (Dateiname -> Anzahl NPCs) wird die am wenigsten
+        genutzte Stimme bevorzugt, der Hash entscheidet nur noch bei Gleichstand."""
+        pool = self.candidates(gender)
+        if not pool: return None
+        if usage:
+            return min(pool, key=lambda v: (usage.get(v.filename, 0), -self._weight(npc_name, v.filename)))
+        return max(pool, key=lambda v: self._weight(npc_name, v.filename))
@@ -0,0 +1,144 @@
+import os
+import cv2
+
+class WindowTracker:
+    """Findet das Quest-Fenster über die zwei gelernten Ecken (oben-links / unten-rechts).
+    Gesucht wird zuerst in einem kleinen Bereich um die letzte Fundstelle, grob auf verkleinerten
+    Graustufen-Pyramiden und dann pixelgenau verfeinert. Nur bei schwacher Übereinstimmung wird der ganze Schirm
+    in mehreren Skalierungen durchsucht. Treffer unter der Schwelle werden verworfen."""
+
+    SCALES = (1.0, 0.9, 1.1, 0.8, 1.25) # UI-Skalierung im Spiel, nächstliegende zuerst
+    GOOD_ENOUGH = 0.95 # ab hier keine weiteren Skalierungen probieren
+
+    _pyramid_cache = {} # (pfad, mtime, größe, skalierungen) -> Pyramiden, überlebt neue Tracker-Instanzen
+
+    def __init__(self, template_tl, template_br, margin=96, min_score=0.7, scales=SCALES, min_template=12):
+        self.margin = margin
+        self.min_score = min_score
+        self.min_template = min_template
+        self.scales = tuple(scales)
+        self.last_area = None
+        self.last_scale = self.scales[0]
+        self.last_scores = (0.0, 0.0)
+        self.tl = template_tl if isinstance(template_tl, dict) else self._build(template_tl)
+        self.br = template_br if isinstance(template_br, dict) else self._build(template_br)
+
+    @classmethod
+    def from_files(cls, tl_path, br_path, **kwargs):
+        """Wie der Konstruktor, aber die Template-Pyramiden werden pro Datei (mtime) nur einmal gebaut."""
+        scales = tuple(kwargs.get("scales", cls.SCALES))
+        min_template = kwargs.get("min_template", 12)
+        def load(path):
+            st = os.stat(path)
+            key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, scales, min_template)
+            if key not in cls._pyramid_cache:
+                img = cv2.imread(path)
+                if img is None: raise ValueError(f"Template nicht lesbar: {path}")
+                cls._pyramid_cache[key] = cls._build_static(img, scales, min_template)
+            return cls._pyramid_cache[key]
+        return cls(load(tl_path), load(br_path), **kwargs)
+
+    @staticmethod
+    def to_gray(img):
+        if img.ndim == 2: return img
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    def _build(self, template):
+        return self._build_static(template, self.scales, self.min_template)
+
+    @staticmethod
+    def _build_static(template, scales, min_template):
+        """Pro Skalierung eine Graustufen-Pyramide (1, 1/2, 1/4), solange das Template groß genug bleibt."""
+        gray = WindowTracker.to_gray(template)
+        out = {}
+        for s in scales:
+            base = gray if s == 1.0 else cv2.resize(gray, None, fx=s, fy=s, interpolation=cv2.INTER_AREA if s < 1 else cv2.INTER_LINEAR)
+            levels = [base]
+            while len(levels) < 3 and min(levels[-1].shape[:2]) // 2 >= min_template:
+                levels.append(cv2.pyrDown(levels[-1]))
+            out[s] = levels
+        return out
+
+    def _match(self, gray, levels, x0, y0, x1, y1):
+        """Sucht das Template im Ausschnitt [x0:x1, y0:y1]. Liefert ((x, y), score) in Bildkoordinaten."""
+        h, w = gray.shape[:2]
+        x0, y0, x1, y1 = max(0, x0), max(0, y0), min(w, x1), min(h, y1)
+        th, tw = levels[0].shape[:2]
+        if x1 - x0 < tw or y1 - y0 < th: return None, 0.0
+        region = gray[y0:y1, x0:x1]
+
+        # Grob: kleinste Pyramidenstufe, die noch ins Suchfenster passt
+        level = len(levels) - 1
+        small = region
+        for _ in range(level): small = cv2.pyrDown(small)
+        while level > 0 and (small.shape[0] < levels[level].shape[0] or small.shape[1] < levels[level].shape[1]):
+            level -= 1
+            small = region
+            for _ in range(level): small = cv2.pyrDown(small)
+        _, score, _, loc = cv2.minMaxLoc(cv2.matchTemplate(small, levels[level], cv2.TM_CCOEFF_NORMED))
+        if level == 0: return (x0 + loc[0], y0 + loc[1]), score
+
+        # Fein: volle Auflösung, nur wenige Pixel um die grobe Position
+        scale = 2 ** level
+        pad = scale * 2
+        cx, cy = loc[0] * scale, loc[1] * scale
+        rx0, ry0 = max(0, cx - pad), max(0, cy - pad)
+        rx1, ry1 = min(region.shape[1], cx + tw + pad), min(region.shape[0], cy + th + pad)
+        _, score, _, loc = cv2.minMaxLoc(cv2.matchTemplate(region[ry0:ry1, rx0:rx1], levels[0], cv2.TM_CCOEFF_NORMED))
+        return (x0 + rx0 + loc[0], y0 + ry0 + loc[1]), score
+
+    def _search_roi(self, gray, levels, around):
+        th, tw = levels[0].shape[:2]
+        x, y = around
+        m = self.margin
+        return self._match(gray, levels, x - m, y - m, x + tw + m, y + th + m)
+
+    def _search_full(self, gray, pyramids):
+        """Ganzer Schirm, alle Skalierungen (zuletzt erfolgreiche zuerst). Liefert (pos, score, scale)."""
+        best = (None, 0.0, self.last_scale)
+        order = [self.last_scale] + [s for s in self.scales if s != self.last_scale]
+        for s in order:
+            pos, score = self._match(gray, pyramids[s], 0, 0, gray.shape[1], gray.shape[0])
+            if score > best[1]: best = (pos, score, s)
+            if score >= self.GOOD_ENOUGH: break
+        return best
+
+    def verify(self, frame, area, origin=(0, 0), margin=4):
+        """Billiger Check, ob beide Ecken noch genau an area liegen (nur volle Auflösung, wenige Pixel Spielraum).
+        frame darf ein Ausschnitt sein, der bei origin (Bildschirmkoordinaten) beginnt."""
+        gray = self.to_gray(frame)
+        x, y, w, h = area
+        ox, oy = origin
+        tl, br = self.tl[self.last_scale][:1], self.br[self.last_scale][:1]
+        th, tw = tl[0].shape[:2]
+        bh, bw = br[0].shape[:2]
+        m = margin
+        _, s_tl = self._match(gray, tl, x - ox - m, y - oy - m, x - ox + tw + m, y - oy + th + m)
+        if s_tl < self.min_score: return False
+        bx, by = x + w - bw - ox, y + h - bh - oy
+        _, s_br = self._match(gray, br, bx - m, by - m, bx + bw + m, by + bh + m)
+        return s_br >= self.min_score
+
+    def locate(self, frame):
+        """frame: BGR oder Graustufen-Screenshot. Liefert (x, y, w, h) des Dialogs oder None,
+        wenn eine der Ecken unter min_score liegt. Die Scores stehen danach in last_scores."""
+        gray = self.to_gray(frame)
+        tl = br = None
+        s_tl = s_br = 0.0
+        scale_tl = scale_br = self.last_scale
+        if self.last_area is not None:
+            x, y, w, h = self.last_area
+            bh, bw = self.br[self.last_scale][0].shape[:2]
+            tl, s_tl = self._search_roi(gray, self.tl[self.last_scale], (x, y))
+            br, s_br = self._search_roi(gray, self.br[self.last_scale], (x + w - bw, y + h - bh))
+        if tl is None or s_tl < self.min_score: tl, s_tl, scale_tl = self._search_full(gray, self.tl)
+        if br is None or s_br < self.min_score: br, s_br, scale_br = self._search_full(gray, self.br)
+        self.last_scores = (s_tl, s_br)
+        if tl is None or br is None or min(s_tl, s_br) < self.min_score: return None
+
+        bh, bw = self.br[scale_br][0].shape[:2]
+        area = (tl[0], tl[1], (br[0] + bw) - tl[0], (br[1] + bh) - tl[1])
+        if area[2] <= 0 or area[3] <= 0: return None
+        self.last_area = area
+        self.last_scale = scale_tl
+        return area